@@ -4,12 +4,12 @@ Debug script to test input processing in isolation.
 """
 
 import json
-from src.hotel_revenue_optimization.utils.nlp_processor import NLPProcessor
+from src.hotel_revenue_optimization.utils.nlp_processor import nlp_processor
 
 def test_nlp_processor():
     """Test the NLP processor with different inputs"""
     
-    nlp = NLPProcessor()
+    nlp = nlp_processor
     
     # Test 1: Dictionary input
     print("=== Test 1: Dictionary Input ===")
@@ -98,8 +98,6 @@ def test_main_input_processing():
     print(json.dumps(payload, indent=2))
     
     # Simulate the processing in main.py
-    nlp_processor = NLPProcessor()
-    
     if payload:
         if isinstance(payload, str):
             inputs = nlp_processor.process_input(payload)
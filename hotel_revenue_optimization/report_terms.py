@@ -0,0 +1,17 @@
+#!/usr/bin/env python
+"""
+Expected-term checks shared by the manual test scripts.
+"""
+
+import re
+
+def find_terms(report, terms):
+    """Return the subset of terms that occur in report, stopping once all have been seen."""
+    pattern = re.compile("(?=(" + "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)) + "))")
+    wanted = set(terms)
+    found = set()
+    for match in pattern.finditer(report):
+        found.add(match.group(1))
+        if found == wanted:
+            break
+    return found
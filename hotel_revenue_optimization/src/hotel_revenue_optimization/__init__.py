@@ -1,8 +1,14 @@
 # Hotel Revenue Optimization System
 # A multi-agent AI solution for hotel revenue management using CrewAI and Amazon Bedrock AgentCore
 
-from .crew import HotelRevenueOptimizationCrew
 from .utils.observability import observability
-from .utils.nlp_processor import NLPProcessor
+from .utils.nlp_processor import NLPProcessor, nlp_processor
 
-__all__ = ['HotelRevenueOptimizationCrew', 'observability', 'NLPProcessor']
+def __getattr__(name):
+    # The crew pulls in CrewAI and the Bedrock model stack, so load it on first use only
+    if name == 'HotelRevenueOptimizationCrew':
+        from .crew import HotelRevenueOptimizationCrew
+        return HotelRevenueOptimizationCrew
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ['HotelRevenueOptimizationCrew', 'observability', 'NLPProcessor', 'nlp_processor']
@@ -27,11 +27,6 @@ from .utils.markdown_formatter import formatter
 class HotelRevenueOptimizationCrew:
     """Hotel Revenue Optimization Crew for multi-agent revenue analysis"""
 
-    def __init__(self):
-        self.agents = []
-        self.tasks = []
-        self.task_times = {}  # Track task completion times
-
     class Meta:
         verbose = False      # disable verbose logs for speed
         use_rich = False     # disable Rich graphical logs for speed
@@ -10,8 +10,8 @@ from datetime import datetime, timedelta
 import traceback
 from typing import Dict, Any, Union
 
-# Import crew for hotel revenue optimization
-from src.hotel_revenue_optimization import HotelRevenueOptimizationCrew, observability, NLPProcessor
+# The crew itself is imported inside run() so rejected queries never load CrewAI
+from src.hotel_revenue_optimization import observability, nlp_processor
 
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 
@@ -55,9 +55,6 @@ def run(payload=None):
     )
     
     try:
-        # Initialize NLP processor
-        nlp_processor = NLPProcessor()
-        
         # Process input - handle both structured JSON and natural language
         if payload:
             # Check if payload is wrapped in UI format (prompt or message)
@@ -307,6 +304,7 @@ def run(payload=None):
         inputs['implementation_start_date'] = next_monday.strftime("%B %d, %Y")
         
         # Create the crew for hotel revenue optimization
+        from src.hotel_revenue_optimization.crew import HotelRevenueOptimizationCrew
         crew = HotelRevenueOptimizationCrew()
         
         # Run the crew
@@ -1,7 +1,78 @@
 #!/usr/bin/env python
 import re
 import json
-from typing import Dict, Any, Optional, Union
+import functools
+from typing import Dict, Any, Optional, Tuple, Union
+
+# Compiled patterns shared by the special-case handlers and normalizers
+_LOCATION_IN_RE = re.compile(r'in\s+([A-Za-z\s,]+)', re.IGNORECASE)
+_LOCATION_IN_FOR_RE = re.compile(r'(?:in|for)\s+([A-Za-z\s,]+)', re.IGNORECASE)
+_HOTEL_TYPE_RE = re.compile(r'(luxury|budget|business|boutique|resort)\s+hotels?', re.IGNORECASE)
+_PERIOD_RE = re.compile(r'(?:for|next|coming)\s+(\d+\s+(?:days|weeks|months|quarters?|years?))', re.IGNORECASE)
+_CITY_STATE_RE = re.compile(r'[A-Za-z\s]+,\s*[A-Z]{2}')
+_NUMBER_RE = re.compile(r'(\d+)')
+_HOTEL_KEYWORD_RE = re.compile(r'hotel|resort|inn|suites|plaza', re.IGNORECASE)
+
+# Common city-state mappings (earlier entries win when several cities appear)
+_CITY_STATE_MAP = {
+    'new york': 'New York, NY',
+    'los angeles': 'Los Angeles, CA',
+    'chicago': 'Chicago, IL',
+    'houston': 'Houston, TX',
+    'phoenix': 'Phoenix, AZ',
+    'philadelphia': 'Philadelphia, PA',
+    'san antonio': 'San Antonio, TX',
+    'san diego': 'San Diego, CA',
+    'dallas': 'Dallas, TX',
+    'san jose': 'San Jose, CA',
+    'austin': 'Austin, TX',
+    'jacksonville': 'Jacksonville, FL',
+    'fort worth': 'Fort Worth, TX',
+    'columbus': 'Columbus, OH',
+    'san francisco': 'San Francisco, CA',
+    'charlotte': 'Charlotte, NC',
+    'indianapolis': 'Indianapolis, IN',
+    'seattle': 'Seattle, WA',
+    'denver': 'Denver, CO',
+    'washington': 'Washington, DC',
+    'boston': 'Boston, MA',
+    'el paso': 'El Paso, TX',
+    'nashville': 'Nashville, TN',
+    'detroit': 'Detroit, MI',
+    'portland': 'Portland, OR',
+    'las vegas': 'Las Vegas, NV',
+    'memphis': 'Memphis, TN',
+    'louisville': 'Louisville, KY',
+    'baltimore': 'Baltimore, MD',
+    'milwaukee': 'Milwaukee, WI',
+    'albuquerque': 'Albuquerque, NM',
+    'tucson': 'Tucson, AZ',
+    'fresno': 'Fresno, CA',
+    'sacramento': 'Sacramento, CA',
+    'kansas city': 'Kansas City, MO',
+    'miami': 'Miami, FL',
+    'orlando': 'Orlando, FL',
+    'atlanta': 'Atlanta, GA'
+}
+
+# All known cities compiled into one alternation (longest first) so a location is scanned once
+_CITY_PRIORITY = {city: index for index, city in enumerate(_CITY_STATE_MAP)}
+_CITY_RE = re.compile('|'.join(
+    re.escape(city) for city in sorted(_CITY_STATE_MAP, key=len, reverse=True)
+))
+
+def _build_instruction_regex(instructions: Dict[str, str]) -> "re.Pattern":
+    """
+    Fuse instruction patterns into a single alternation with one named group per instruction key,
+    so the text is scanned once and each match reports its key via ``match.lastgroup``.
+    """
+    grouped: Dict[str, list] = {}
+    for pattern, instruction_key in instructions.items():
+        grouped.setdefault(instruction_key, []).append(pattern)
+    return re.compile(
+        '|'.join(f"(?P<{key}>{'|'.join(patterns)})" for key, patterns in grouped.items()),
+        re.IGNORECASE
+    )
 
 class NLPProcessor:
     """
@@ -9,6 +80,89 @@ class NLPProcessor:
     This allows the Hotel Revenue Optimization agent to support natural language prompts.
     """
     
+    # Patterns for extracting information from natural language
+    patterns = {
+        'hotel_name': [
+            r'(?:for|optimize|analyze)\s+(?:revenue\s+for\s+)?(?:the\s+)?([A-Za-z\s]+?)(?:\s+in\s+[A-Za-z\s,]+)',
+            r'(?:hotel|property|resort|inn)(?:\s+named|\s+called)?\s+["\']?([^"\'.,;]+)["\']?',
+            r'for\s+(?:the\s+)?([^,.]+?)(?:\s+hotel|\s+resort|\s+inn)',
+            r'(?:analyze|forecast|optimize)\s+(?:for\s+)?(?:the\s+)?([^,.]+?)(?:\s+in\s+|$|\s+hotel|\s+resort)'
+        ],
+        'hotel_location': [
+            r'(?:in|at|located\s+in)\s+([A-Za-z\s]+,\s*[A-Z]{2})',
+            r'(?:in|at|located\s+in)\s+([A-Za-z\s]+)'
+        ],
+        'hotel_rating': [
+            r'(\d+(?:\.\d+)?)\s*(?:star|stars|-star|-stars)',
+            r'rating(?:\s+of)?\s+(\d+(?:\.\d+)?)'
+        ],
+        'room_types': [
+            r'room\s+types?(?:\s+include|\s+are|\s*:)?\s+([^.]+)',
+            r'(?:with|having|offering)\s+([^,.]+?)\s+rooms?'
+        ],
+        'analysis_period': [
+            r'(?:analysis|analyze)(?:\s+for|\s+over|\s+period)?\s+(?:the\s+)?(?:next|coming)\s+(\d+\s+(?:days|weeks|months|quarters|years))',
+            r'(?:for|over|during)(?:\s+the)?\s+(?:next|coming)\s+(\d+\s+(?:days|weeks|months|quarters|years))'
+        ],
+        'forecast_period': [
+            r'(?:forecast|prediction|projections?)(?:\s+for|\s+over|\s+period)?\s+(?:the\s+)?(?:next|coming)\s+(\d+\s+(?:days|weeks|months|quarters|years))',
+            r'(?:next|coming)\s+(\d+\s+(?:days|weeks|months|quarters|years))'
+        ],
+        'historical_occupancy': [
+            r'(?:historical\s+)?occupancy(?:\s+(?:is|of|at))?\s+(\d+(?:\.\d+)?%)',
+            r'(\d+(?:\.\d+)?%)\s+occupancy',
+            r'with\s+(\d+(?:\.\d+)?%)\s+occupancy'
+        ],
+        'current_adr': [
+            r'(?:current\s+)?adr(?:\s+(?:of|at|is))?\s+(\$\d+(?:\.\d+)?)',
+            r'average\s+daily\s+rate(?:\s+(?:of|at|is))?\s+(\$\d+(?:\.\d+)?)',
+            r'adr\s+(\$\d+(?:\.\d+)?)',
+            r'and\s+(\$\d+(?:\.\d+)?)\s+adr',
+            r'with.*?(\$\d+(?:\.\d+)?)\s+adr'
+        ],
+        'current_revpar': [
+            r'(?:current\s+)?revpar(?:\s+of|\s+at|\s+is|\s*:)?\s+(\$\d+(?:\.\d+)?)',
+            r'revenue\s+per\s+available\s+room(?:\s+of|\s+at|\s+is|\s*:)?\s+(\$\d+(?:\.\d+)?)'
+        ],
+        'target_revpar': [
+            r'target\s+revpar(?:\s+of|\s+at|\s+is|\s*:)?\s+(\$\d+(?:\.\d+)?)',
+            r'goal\s+revpar(?:\s+of|\s+at|\s+is|\s*:)?\s+(\$\d+(?:\.\d+)?)'
+        ],
+        'current_challenges': [
+            r'challenges?(?:\s+include|\s+are|\s*:)?\s+([^.]+)',
+            r'issues?(?:\s+include|\s+are|\s*:)?\s+([^.]+)',
+            r'problems?(?:\s+include|\s+are|\s*:)?\s+([^.]+)'
+        ]
+    }
+    
+    # Special case handlers for common request types (resolved to bound methods by name)
+    special_cases = {
+        r'(?:analyze|study)\s+competitor\s+pricing': '_handle_competitor_pricing',
+        r'forecast\s+demand': '_handle_demand_forecast',
+        r'optimize\s+revenue': '_handle_revenue_optimization',
+        r'pricing\s+strategy': '_handle_pricing_strategy',
+        r'occupancy\s+(?:forecast|prediction)': '_handle_occupancy_forecast'
+    }
+    
+    # Optional instruction patterns
+    optional_instructions = {
+        r'include\s+competitor\s+analysis': 'include_competitor_analysis',
+        r'with\s+competitor\s+analysis': 'include_competitor_analysis',
+        r'add\s+competitor\s+analysis': 'include_competitor_analysis',
+        r'competitor\s+analysis\s+included': 'include_competitor_analysis'
+    }
+    
+    # Patterns are compiled once per process and shared by every instance
+    _compiled_patterns = {
+        field: [re.compile(pattern, re.IGNORECASE) for pattern in field_patterns]
+        for field, field_patterns in patterns.items()
+    }
+    _compiled_special_cases = [
+        (re.compile(pattern, re.IGNORECASE), handler_name)
+        for pattern, handler_name in special_cases.items()
+    ]
+    _instructions_re = _build_instruction_regex(optional_instructions)
+    
     def __init__(self):
         # Default values for required fields
         self.defaults = {
@@ -24,93 +178,20 @@ class NLPProcessor:
             'target_revpar': "$195",
             'current_challenges': "Weekday occupancy below target, OTA dependency"
         }
-        
-        # Patterns for extracting information from natural language
-        self.patterns = {
-            'hotel_name': [
-                r'(?:for|optimize|analyze)\s+(?:revenue\s+for\s+)?(?:the\s+)?([A-Za-z\s]+?)(?:\s+in\s+[A-Za-z\s,]+)',
-                r'(?:hotel|property|resort|inn)(?:\s+named|\s+called)?\s+["\']?([^"\'.,;]+)["\']?',
-                r'for\s+(?:the\s+)?([^,.]+?)(?:\s+hotel|\s+resort|\s+inn)',
-                r'(?:analyze|forecast|optimize)\s+(?:for\s+)?(?:the\s+)?([^,.]+?)(?:\s+in\s+|$|\s+hotel|\s+resort)'
-            ],
-            'hotel_location': [
-                r'(?:in|at|located\s+in)\s+([A-Za-z\s]+,\s*[A-Z]{2})',
-                r'(?:in|at|located\s+in)\s+([A-Za-z\s]+)'
-            ],
-            'hotel_rating': [
-                r'(\d+(?:\.\d+)?)\s*(?:star|stars|-star|-stars)',
-                r'rating(?:\s+of)?\s+(\d+(?:\.\d+)?)'
-            ],
-            'room_types': [
-                r'room\s+types?(?:\s+include|\s+are|\s*:)?\s+([^.]+)',
-                r'(?:with|having|offering)\s+([^,.]+?)\s+rooms?'
-            ],
-            'analysis_period': [
-                r'(?:analysis|analyze)(?:\s+for|\s+over|\s+period)?\s+(?:the\s+)?(?:next|coming)\s+(\d+\s+(?:days|weeks|months|quarters|years))',
-                r'(?:for|over|during)(?:\s+the)?\s+(?:next|coming)\s+(\d+\s+(?:days|weeks|months|quarters|years))'
-            ],
-            'forecast_period': [
-                r'(?:forecast|prediction|projections?)(?:\s+for|\s+over|\s+period)?\s+(?:the\s+)?(?:next|coming)\s+(\d+\s+(?:days|weeks|months|quarters|years))',
-                r'(?:next|coming)\s+(\d+\s+(?:days|weeks|months|quarters|years))'
-            ],
-            'historical_occupancy': [
-                r'(?:historical\s+)?occupancy(?:\s+(?:is|of|at))?\s+(\d+(?:\.\d+)?%)',
-                r'(\d+(?:\.\d+)?%)\s+occupancy',
-                r'with\s+(\d+(?:\.\d+)?%)\s+occupancy'
-            ],
-            'current_adr': [
-                r'(?:current\s+)?adr(?:\s+(?:of|at|is))?\s+(\$\d+(?:\.\d+)?)',
-                r'average\s+daily\s+rate(?:\s+(?:of|at|is))?\s+(\$\d+(?:\.\d+)?)',
-                r'adr\s+(\$\d+(?:\.\d+)?)',
-                r'and\s+(\$\d+(?:\.\d+)?)\s+adr',
-                r'with.*?(\$\d+(?:\.\d+)?)\s+adr'
-            ],
-            'current_revpar': [
-                r'(?:current\s+)?revpar(?:\s+of|\s+at|\s+is|\s*:)?\s+(\$\d+(?:\.\d+)?)',
-                r'revenue\s+per\s+available\s+room(?:\s+of|\s+at|\s+is|\s*:)?\s+(\$\d+(?:\.\d+)?)'
-            ],
-            'target_revpar': [
-                r'target\s+revpar(?:\s+of|\s+at|\s+is|\s*:)?\s+(\$\d+(?:\.\d+)?)',
-                r'goal\s+revpar(?:\s+of|\s+at|\s+is|\s*:)?\s+(\$\d+(?:\.\d+)?)'
-            ],
-            'current_challenges': [
-                r'challenges?(?:\s+include|\s+are|\s*:)?\s+([^.]+)',
-                r'issues?(?:\s+include|\s+are|\s*:)?\s+([^.]+)',
-                r'problems?(?:\s+include|\s+are|\s*:)?\s+([^.]+)'
-            ]
-        }
-        
-        # Special case handlers for common request types
-        self.special_cases = {
-            r'(?:analyze|study)\s+competitor\s+pricing': self._handle_competitor_pricing,
-            r'forecast\s+demand': self._handle_demand_forecast,
-            r'optimize\s+revenue': self._handle_revenue_optimization,
-            r'pricing\s+strategy': self._handle_pricing_strategy,
-            r'occupancy\s+(?:forecast|prediction)': self._handle_occupancy_forecast
-        }
-        
-        # Optional instruction patterns
-        self.optional_instructions = {
-            r'include\s+competitor\s+analysis': 'include_competitor_analysis',
-            r'with\s+competitor\s+analysis': 'include_competitor_analysis',
-            r'add\s+competitor\s+analysis': 'include_competitor_analysis',
-            r'competitor\s+analysis\s+included': 'include_competitor_analysis'
-        }
     
     def _detect_optional_instructions(self, text: str) -> Dict[str, bool]:
         """Detect optional instructions in the input text."""
         instructions = {}
         
-        for pattern, instruction_key in self.optional_instructions.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                instructions[instruction_key] = True
+        for match in self._instructions_re.finditer(text):
+            instructions[match.lastgroup] = True
         
         return instructions
     
     def _extract_with_patterns(self, text: str, field: str) -> Optional[str]:
         """Extract information using regex patterns for a specific field."""
-        for pattern in self.patterns[field]:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for regex in self._compiled_patterns[field]:
+            match = regex.search(text)
             if match:
                 return match.group(1).strip()
         return None
@@ -120,12 +201,12 @@ class NLPProcessor:
         result = {}
         
         # Extract location
-        location_match = re.search(r'in\s+([A-Za-z\s,]+)', text, re.IGNORECASE)
+        location_match = _LOCATION_IN_RE.search(text)
         if location_match:
             result['hotel_location'] = location_match.group(1).strip()
         
         # Extract hotel type/segment
-        hotel_type_match = re.search(r'(luxury|budget|business|boutique|resort)\s+hotels?', text, re.IGNORECASE)
+        hotel_type_match = _HOTEL_TYPE_RE.search(text)
         if hotel_type_match:
             hotel_type = hotel_type_match.group(1).strip()
             result['hotel_name'] = f"{hotel_type.capitalize()} Hotel"
@@ -150,18 +231,18 @@ class NLPProcessor:
         result = {}
         
         # Extract location
-        location_match = re.search(r'(?:in|for)\s+([A-Za-z\s,]+)', text, re.IGNORECASE)
+        location_match = _LOCATION_IN_FOR_RE.search(text)
         if location_match:
             result['hotel_location'] = location_match.group(1).strip()
         
         # Extract hotel type/segment
-        hotel_type_match = re.search(r'(luxury|budget|business|boutique|resort)\s+hotels?', text, re.IGNORECASE)
+        hotel_type_match = _HOTEL_TYPE_RE.search(text)
         if hotel_type_match:
             hotel_type = hotel_type_match.group(1).strip()
             result['hotel_name'] = f"{hotel_type.capitalize()} Hotel"
         
         # Extract time period
-        period_match = re.search(r'(?:for|next|coming)\s+(\d+\s+(?:days|weeks|months|quarters?|years?))', text, re.IGNORECASE)
+        period_match = _PERIOD_RE.search(text)
         if period_match:
             period = period_match.group(1).strip()
             result['analysis_period'] = f"Next {period}"
@@ -180,12 +261,12 @@ class NLPProcessor:
         result = {}
         
         # Extract location
-        location_match = re.search(r'(?:in|for)\s+([A-Za-z\s,]+)', text, re.IGNORECASE)
+        location_match = _LOCATION_IN_FOR_RE.search(text)
         if location_match:
             result['hotel_location'] = location_match.group(1).strip()
         
         # Extract hotel type/segment
-        hotel_type_match = re.search(r'(luxury|budget|business|boutique|resort)\s+hotels?', text, re.IGNORECASE)
+        hotel_type_match = _HOTEL_TYPE_RE.search(text)
         if hotel_type_match:
             hotel_type = hotel_type_match.group(1).strip()
             result['hotel_name'] = f"{hotel_type.capitalize()} Hotel"
@@ -200,12 +281,12 @@ class NLPProcessor:
         result = {}
         
         # Extract location
-        location_match = re.search(r'(?:in|for)\s+([A-Za-z\s,]+)', text, re.IGNORECASE)
+        location_match = _LOCATION_IN_FOR_RE.search(text)
         if location_match:
             result['hotel_location'] = location_match.group(1).strip()
         
         # Extract hotel type/segment
-        hotel_type_match = re.search(r'(luxury|budget|business|boutique|resort)\s+hotels?', text, re.IGNORECASE)
+        hotel_type_match = _HOTEL_TYPE_RE.search(text)
         if hotel_type_match:
             hotel_type = hotel_type_match.group(1).strip()
             result['hotel_name'] = f"{hotel_type.capitalize()} Hotel"
@@ -220,18 +301,18 @@ class NLPProcessor:
         result = {}
         
         # Extract location
-        location_match = re.search(r'(?:in|for)\s+([A-Za-z\s,]+)', text, re.IGNORECASE)
+        location_match = _LOCATION_IN_FOR_RE.search(text)
         if location_match:
             result['hotel_location'] = location_match.group(1).strip()
         
         # Extract hotel type/segment
-        hotel_type_match = re.search(r'(luxury|budget|business|boutique|resort)\s+hotels?', text, re.IGNORECASE)
+        hotel_type_match = _HOTEL_TYPE_RE.search(text)
         if hotel_type_match:
             hotel_type = hotel_type_match.group(1).strip()
             result['hotel_name'] = f"{hotel_type.capitalize()} Hotel"
         
         # Extract time period
-        period_match = re.search(r'(?:for|next|coming)\s+(\d+\s+(?:days|weeks|months|quarters?|years?))', text, re.IGNORECASE)
+        period_match = _PERIOD_RE.search(text)
         if period_match:
             period = period_match.group(1).strip()
             result['analysis_period'] = f"Next {period}"
@@ -247,64 +328,21 @@ class NLPProcessor:
     
     def _handle_special_cases(self, text: str) -> Dict[str, str]:
         """Check if the text matches any special case patterns and handle accordingly."""
-        for pattern, handler in self.special_cases.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                return handler(text)
+        for regex, handler_name in self._compiled_special_cases:
+            if regex.search(text):
+                return getattr(self, handler_name)(text)
         return {}
     
     def _extract_city_state(self, location: str) -> str:
         """Format location as City, State if possible."""
         # Check if location already has state code
-        if re.search(r'[A-Za-z\s]+,\s*[A-Z]{2}', location):
+        if _CITY_STATE_RE.search(location):
             return location
         
-        # Common city-state mappings
-        city_state_map = {
-            'new york': 'New York, NY',
-            'los angeles': 'Los Angeles, CA',
-            'chicago': 'Chicago, IL',
-            'houston': 'Houston, TX',
-            'phoenix': 'Phoenix, AZ',
-            'philadelphia': 'Philadelphia, PA',
-            'san antonio': 'San Antonio, TX',
-            'san diego': 'San Diego, CA',
-            'dallas': 'Dallas, TX',
-            'san jose': 'San Jose, CA',
-            'austin': 'Austin, TX',
-            'jacksonville': 'Jacksonville, FL',
-            'fort worth': 'Fort Worth, TX',
-            'columbus': 'Columbus, OH',
-            'san francisco': 'San Francisco, CA',
-            'charlotte': 'Charlotte, NC',
-            'indianapolis': 'Indianapolis, IN',
-            'seattle': 'Seattle, WA',
-            'denver': 'Denver, CO',
-            'washington': 'Washington, DC',
-            'boston': 'Boston, MA',
-            'el paso': 'El Paso, TX',
-            'nashville': 'Nashville, TN',
-            'detroit': 'Detroit, MI',
-            'portland': 'Portland, OR',
-            'las vegas': 'Las Vegas, NV',
-            'memphis': 'Memphis, TN',
-            'louisville': 'Louisville, KY',
-            'baltimore': 'Baltimore, MD',
-            'milwaukee': 'Milwaukee, WI',
-            'albuquerque': 'Albuquerque, NM',
-            'tucson': 'Tucson, AZ',
-            'fresno': 'Fresno, CA',
-            'sacramento': 'Sacramento, CA',
-            'kansas city': 'Kansas City, MO',
-            'miami': 'Miami, FL',
-            'orlando': 'Orlando, FL',
-            'atlanta': 'Atlanta, GA'
-        }
-        
-        # Try to match the location to a known city
-        location_lower = location.lower()
-        for city, city_state in city_state_map.items():
-            if city in location_lower:
-                return city_state
+        # Find every known city in one scan and keep the highest-priority match
+        cities = {match.group(0) for match in _CITY_RE.finditer(location.lower())}
+        if cities:
+            return _CITY_STATE_MAP[min(cities, key=_CITY_PRIORITY.__getitem__)]
         
         # If no match, return the original location
         return location
@@ -323,7 +361,7 @@ class NLPProcessor:
         # Handle month references
         if 'month' in period_lower:
             # Extract number if present
-            num_match = re.search(r'(\d+)', period_lower)
+            num_match = _NUMBER_RE.search(period_lower)
             if num_match:
                 num = int(num_match.group(1))
                 return f"Next {num * 30} days"
@@ -332,7 +370,7 @@ class NLPProcessor:
         # Handle week references
         if 'week' in period_lower:
             # Extract number if present
-            num_match = re.search(r'(\d+)', period_lower)
+            num_match = _NUMBER_RE.search(period_lower)
             if num_match:
                 num = int(num_match.group(1))
                 return f"Next {num * 7} days"
@@ -368,11 +406,84 @@ class NLPProcessor:
             return None
             
         # If name doesn't contain "Hotel", "Resort", "Inn", etc., add "Hotel"
-        hotel_keywords = ['hotel', 'resort', 'inn', 'suites', 'plaza']
-        if not any(keyword in name.lower() for keyword in hotel_keywords):
+        if not _HOTEL_KEYWORD_RE.search(name):
             return f"{name} Hotel"
         return name
     
+    def _process_text(self, input_data: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a JSON string or natural language string on top of the given default values.
+        """
+        # Check if it's a JSON string
+        try:
+            json_data = json.loads(input_data)
+            if isinstance(json_data, dict):
+                # Update result with provided values
+                for key, value in json_data.items():
+                    if key in result:
+                        result[key] = value
+                return result
+        except (json.JSONDecodeError, ValueError):
+            # Not a valid JSON string, treat as natural language
+            pass
+        
+        # Check for "prompt" field in case of {"prompt": "..."} format
+        try:
+            json_data = json.loads(input_data)
+            if isinstance(json_data, dict) and "prompt" in json_data:
+                input_text = json_data["prompt"]
+            else:
+                input_text = input_data
+        except (json.JSONDecodeError, ValueError):
+            input_text = input_data
+        
+        # Process as natural language
+        # Detect optional instructions first
+        optional_instructions = self._detect_optional_instructions(input_text)
+        
+        # First check for special cases
+        special_case_result = self._handle_special_cases(input_text)
+        if special_case_result:
+            for key, value in special_case_result.items():
+                result[key] = value
+        
+        # Then extract specific fields using patterns
+        for field in self.patterns.keys():
+            extracted_value = self._extract_with_patterns(input_text, field)
+            if extracted_value:
+                result[field] = extracted_value
+        
+        # Add optional instructions to result
+        for instruction_key, value in optional_instructions.items():
+            result[instruction_key] = str(value).lower()
+        
+        # Normalize extracted values
+        if 'hotel_location' in result:
+            result['hotel_location'] = self._extract_city_state(result['hotel_location'])
+        
+        if 'hotel_name' in result:
+            result['hotel_name'] = self._normalize_hotel_name(result['hotel_name'])
+        
+        if 'analysis_period' in result:
+            result['analysis_period'] = self._normalize_period(result['analysis_period'])
+        
+        if 'forecast_period' in result:
+            result['forecast_period'] = self._normalize_period(result['forecast_period'])
+        
+        if 'historical_occupancy' in result:
+            result['historical_occupancy'] = self._normalize_percentage(result['historical_occupancy'])
+        
+        if 'current_adr' in result:
+            result['current_adr'] = self._normalize_currency(result['current_adr'])
+        
+        if 'current_revpar' in result:
+            result['current_revpar'] = self._normalize_currency(result['current_revpar'])
+        
+        if 'target_revpar' in result:
+            result['target_revpar'] = self._normalize_currency(result['target_revpar'])
+        
+        return result
+    
     def process_input(self, input_data: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
         """
         Process the input data, which can be either a JSON object or a natural language string.
@@ -389,77 +500,17 @@ class NLPProcessor:
                     result[key] = value
             return result
         
-        # If input is a string, check if it's a JSON string
+        # If input is a string, process it (cached on the prompt and the defaults in effect)
         if isinstance(input_data, str):
-            # Check if it's a JSON string
-            try:
-                json_data = json.loads(input_data)
-                if isinstance(json_data, dict):
-                    # Update result with provided values
-                    for key, value in json_data.items():
-                        if key in result:
-                            result[key] = value
-                    return result
-            except (json.JSONDecodeError, ValueError):
-                # Not a valid JSON string, treat as natural language
-                pass
-            
-            # Check for "prompt" field in case of {"prompt": "..."} format
-            try:
-                json_data = json.loads(input_data)
-                if isinstance(json_data, dict) and "prompt" in json_data:
-                    input_text = json_data["prompt"]
-                else:
-                    input_text = input_data
-            except (json.JSONDecodeError, ValueError):
-                input_text = input_data
-            
-            # Process as natural language
-            # Detect optional instructions first
-            optional_instructions = self._detect_optional_instructions(input_text)
-            
-            # First check for special cases
-            special_case_result = self._handle_special_cases(input_text)
-            if special_case_result:
-                for key, value in special_case_result.items():
-                    result[key] = value
-            
-            # Then extract specific fields using patterns
-            for field in self.patterns.keys():
-                extracted_value = self._extract_with_patterns(input_text, field)
-                if extracted_value:
-                    result[field] = extracted_value
-            
-            # Add optional instructions to result
-            for instruction_key, value in optional_instructions.items():
-                result[instruction_key] = str(value).lower()
-            
-            # Normalize extracted values
-            if 'hotel_location' in result:
-                result['hotel_location'] = self._extract_city_state(result['hotel_location'])
-            
-            if 'hotel_name' in result:
-                result['hotel_name'] = self._normalize_hotel_name(result['hotel_name'])
-            
-            if 'analysis_period' in result:
-                result['analysis_period'] = self._normalize_period(result['analysis_period'])
-            
-            if 'forecast_period' in result:
-                result['forecast_period'] = self._normalize_period(result['forecast_period'])
-            
-            if 'historical_occupancy' in result:
-                result['historical_occupancy'] = self._normalize_percentage(result['historical_occupancy'])
-            
-            if 'current_adr' in result:
-                result['current_adr'] = self._normalize_currency(result['current_adr'])
-            
-            if 'current_revpar' in result:
-                result['current_revpar'] = self._normalize_currency(result['current_revpar'])
-            
-            if 'target_revpar' in result:
-                result['target_revpar'] = self._normalize_currency(result['target_revpar'])
-            
-            return result
+            return dict(_process_text_cached(input_data, tuple(result.items())))
         
         # If input is neither a dictionary nor a string, return defaults
         return result
+
+# Create a singleton instance (also used for cached string processing)
+nlp_processor = NLPProcessor()
+
+@functools.lru_cache(maxsize=4096)
+def _process_text_cached(text: str, defaults: Tuple[Tuple[str, Any], ...]) -> Tuple[Tuple[str, Any], ...]:
+    """Cache processed prompts so repeated inputs skip the regex pipeline."""
+    return tuple(nlp_processor._process_text(text, dict(defaults)).items())
@@ -181,25 +181,6 @@ class ObservabilityTracker:
                 metrics.record_task(kwargs["task_name"], "error")
             metrics.record_request(agent_name, "error", 0)
     
-    def get_task_results(self):
-        """Get the task results"""
-        return self.task_results
-    
-    def get_failed_tasks(self):
-        """Get the failed tasks"""
-        return self.failed_tasks
-    
-    def prepare_response_with_partial_results(self):
-        """Prepare a response with partial results"""
-        return {
-            "status": "partial_success",
-            "completed_tasks": list(self.task_results.keys()),
-            "failed_tasks": list(self.failed_tasks.keys()),
-            "results": {
-                task_name: {"output": task_result.get("result", {}).get("output", "")}
-                for task_name, task_result in self.task_results.items()
-            }
-        }
     def get_task_durations(self) -> Dict[str, float]:
         """Get task durations for completed tasks. Only returns real measured durations."""
         durations = {}
@@ -3,11 +3,20 @@ import json
 import sys
 import time
 import os
+import random
+import threading
 import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Callable, FrozenSet, Optional, List, Union
 import traceback
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # AWS Distro for OpenTelemetry (ADOT) imports
 from aws_otel.genai import configure_opentelemetry
 from aws_otel.genai.trace import GenAITracer
@@ -17,56 +26,55 @@ from opentelemetry import trace
 from opentelemetry.trace.status import Status, StatusCode
 from opentelemetry.semconv.resource import ResourceAttributes
 
+# Extra fields promoted to top-level keys of every JSON log line
+_PROMOTED_FIELDS = ('event_type', 'agent', 'model', 'task', 'crew', 'duration_seconds', 'status')
+
+# Standard LogRecord attributes that are never copied into the JSON output
+_RESERVED_FIELDS = frozenset((
+    'args', 'asctime', 'created', 'exc_info', 'exc_text', 
+    'filename', 'funcName', 'id', 'levelname', 'levelno', 
+    'lineno', 'module', 'msecs', 'message', 'msg', 'name', 
+    'pathname', 'process', 'processName', 'relativeCreated', 
+    'stack_info', 'thread', 'threadName'
+)).union(_PROMOTED_FIELDS)
+
 # Configure JSON logging to console
 class JsonFormatter(logging.Formatter):
     """JSON log formatter that outputs logs in a structured format"""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Per-thread scratch dict reused for every record instead of allocating a new one
+        self._scratch = threading.local()
+    
+    def _get_log_data(self) -> Dict[str, Any]:
+        """Get the cleared scratch dict for the current thread"""
+        log_data = getattr(self._scratch, "log_data", None)
+        if log_data is None:
+            log_data = self._scratch.log_data = {}
+        else:
+            log_data.clear()
+        return log_data
+    
     def format(self, record):
-        log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "level": record.levelname,
-            "message": record.getMessage(),
-            "logger": record.name
-        }
+        # The scratch dict is safe to reuse because it is serialized before this method returns
+        log_data = self._get_log_data()
+        log_data["timestamp"] = datetime.utcnow().isoformat()
+        log_data["level"] = record.levelname
+        log_data["message"] = record.getMessage()
+        log_data["logger"] = record.name
         
         # Add extra fields from the record
-        if hasattr(record, 'event_type'):
-            log_data['event_type'] = record.event_type
-            
-        if hasattr(record, 'agent'):
-            log_data['agent'] = record.agent
-            
-        if hasattr(record, 'model'):
-            log_data['model'] = record.model
-            
-        if hasattr(record, 'task'):
-            log_data['task'] = record.task
-            
-        if hasattr(record, 'crew'):
-            log_data['crew'] = record.crew
-            
-        if hasattr(record, 'duration_seconds'):
-            log_data['duration_seconds'] = record.duration_seconds
-            
-        if hasattr(record, 'status'):
-            log_data['status'] = record.status
+        record_dict = record.__dict__
+        for key in _PROMOTED_FIELDS:
+            if key in record_dict:
+                log_data[key] = record_dict[key]
             
         # Add any other extra attributes
-        for key, value in record.__dict__.items():
-            if key not in ('args', 'asctime', 'created', 'exc_info', 'exc_text', 
-                          'filename', 'funcName', 'id', 'levelname', 'levelno', 
-                          'lineno', 'module', 'msecs', 'message', 'msg', 'name', 
-                          'pathname', 'process', 'processName', 'relativeCreated', 
-                          'stack_info', 'thread', 'threadName', 'event_type', 
-                          'agent', 'model', 'task', 'crew', 'duration_seconds', 'status'):
+        for key, value in record_dict.items():
+            if key not in _RESERVED_FIELDS:
                 if not key.startswith('_') and not callable(value):
-                    try:
-                        # Try to serialize the value to ensure it's JSON-compatible
-                        json.dumps({key: value})
-                        log_data[key] = value
-                    except (TypeError, OverflowError):
-                        # If not serializable, convert to string
-                        log_data[key] = str(value)
+                    log_data[key] = value
         
         # Add exception info if present
         if record.exc_info:
@@ -76,7 +84,13 @@ class JsonFormatter(logging.Formatter):
                 'traceback': traceback.format_exception(*record.exc_info)
             }
             
-        return json.dumps(log_data)
+        # Serialize once; values that are not JSON-compatible are converted to strings
+        if orjson is not None:
+            try:
+                return orjson.dumps(log_data, default=str).decode()
+            except TypeError:
+                pass
+        return json.dumps(log_data, default=str)
 
 # Configure root logger
 logger = logging.getLogger("HotelRevenueOptimization")
@@ -107,15 +121,201 @@ configure_opentelemetry(
 genai_tracer = GenAITracer()
 genai_metrics = GenAIMetrics()
 
-class OtelLogger:
+# Resolve the service tracer once instead of on every span
+_TRACER = trace.get_tracer(service_name)
+
+# Head-based sampling rate for MODEL_INVOKE spans (1.0 records every invocation)
+try:
+    _SAMPLE_RATE = float(os.environ.get("OTEL_TRACES_SAMPLER_ARG", "1.0"))
+except ValueError:
+    _SAMPLE_RATE = 1.0
+
+def _identity(value: Any) -> Any:
+    return value
+
+def _null(value: None) -> str:
+    return "null"
+
+def _json_or_str(value: Any) -> Any:
+    """Fallback encoder for subclasses of primitive types and complex objects"""
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    try:
+        # Try to convert to JSON string for complex objects
+        return json.dumps(value)
+    except (TypeError, ValueError):
+        # If not serializable, convert to string
+        return str(value)
+
+# Span attribute encoders dispatched on the exact value type
+_ATTR_ENCODERS = {
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    type(None): _null
+}
+
+def _to_attr(value: Any) -> Any:
+    """Convert a value into an OpenTelemetry-compatible span attribute value"""
+    return _ATTR_ENCODERS.get(type(value), _json_or_str)(value)
+
+# Maximum number of specialized result encoders kept by OtelLogger
+_MAX_RESULT_ENCODERS = 32
+
+def _compile_result_encoder(keys: FrozenSet[str]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
     """
-    AWS Distro for OpenTelemetry (ADOT) focused logger for GenAI that creates spans and logs to console in JSON format.
+    Generate a function that maps a result dict with exactly these keys to span attributes
+    
+    Keys are embedded with repr() so arbitrary key strings are safe to compile.
     """
+    entries = ", ".join(
+        f"{('result.' + key)!r}: _to_attr(result[{key!r}])" for key in sorted(keys)
+    )
+    source = f"def encode(result):\n    return {{{entries}}}\n"
+    namespace = {"_to_attr": _to_attr}
+    exec(compile(source, "<result_encoder>", "exec"), namespace)
+    return namespace["encode"]
+
+class _NoopSpan:
+    """Stand-in for an unsampled span that keeps only the attributes end_operation reads back"""
+    
+    __slots__ = ("attributes",)
+    
+    def __init__(self, attributes: Dict[str, Any]):
+        self.attributes = attributes
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update(attributes)
+    
+    def set_status(self, status: Status):
+        pass
+    
+    def record_exception(self, exception: Exception, attributes: Optional[Dict[str, Any]] = None):
+        pass
+    
+    def is_recording(self) -> bool:
+        return False
+    
+    def end(self):
+        pass
+
+class _SpanRec:
+    """In-flight operation record stored in OtelLogger's spans, keyed by operation_id"""
+    
+    __slots__ = ("span", "operation_type", "model_name", "start_time")
+    
+    def __init__(self, span: Any, operation_type: str, model_name: str, start_time: float):
+        self.span = span
+        self.operation_type = operation_type
+        self.model_name = model_name
+        self.start_time = start_time
+
+class _Run:
+    """Task states registered by the execution contexts taking part in one crew run"""
+    
+    __slots__ = ("states", "lock")
     
     def __init__(self):
+        self.states: List["_TaskState"] = []
+        self.lock = threading.Lock()
+
+class _TaskState:
+    """Task outcomes recorded within a single execution context during one run"""
+    
+    __slots__ = ("run", "task_results", "completed_task_order", "failed_tasks")
+    
+    def __init__(self, run: _Run):
+        self.run = run
         self.task_results: Dict[str, Dict[str, Any]] = {}
+        self.completed_task_order: List[str] = []
         self.failed_tasks: List[Dict[str, Any]] = []
-        self.spans: Dict[str, Any] = {}
+
+class OtelLogger:
+    """
+    AWS Distro for OpenTelemetry (ADOT) focused logger for GenAI that creates spans and logs to console in JSON format.
+    """
+    
+    def __init__(self):
+        # In-flight spans, keyed by operation_id so an operation may end in another thread
+        self._spans: Dict[str, _SpanRec] = {}
+        self._spans_lock = threading.Lock()
+        
+        # The current run is bound to the context that called start_run(), and inherited by
+        # contexts copied from it (asyncio tasks, contextvars.copy_context().run in worker
+        # threads). Each context registers its own task state with that run, so concurrent
+        # runs never see or reset each other's results, and a run's state is released with it.
+        self._run: ContextVar[Optional[_Run]] = ContextVar("otel_run", default=None)
+        self._task_state: ContextVar[Optional[_TaskState]] = ContextVar("otel_task_state", default=None)
+        
+        # Specialized result -> span attribute encoders keyed by result key set (bounded, oldest evicted first)
+        self._result_encoders: "OrderedDict[FrozenSet[str], Callable]" = OrderedDict()
+        self._result_encoders_lock = threading.Lock()
+        
+        # Bind logger methods once to avoid attribute lookups on every call
+        self._log_debug = logger.debug
+        self._log_info = logger.info
+        self._log_warning = logger.warning
+        self._log_error = logger.error
+    
+    def _get_task_state(self) -> _TaskState:
+        """Get the task state for the current context and run, creating and registering it on first use"""
+        run = self._run.get()
+        if run is None:
+            # Outside any started run the context acts as its own run
+            run = _Run()
+            self._run.set(run)
+        state = self._task_state.get()
+        # A state left over from an earlier run (e.g. in a reused worker thread) is replaced
+        if state is None or state.run is not run:
+            state = _TaskState(run)
+            with run.lock:
+                run.states.append(state)
+            self._task_state.set(state)
+        return state
+    
+    def _get_run_states(self) -> List[_TaskState]:
+        """Task states registered with the current context's run"""
+        run = self._run.get()
+        if run is None:
+            return []
+        with run.lock:
+            return list(run.states)
+    
+    def start_run(self) -> None:
+        """
+        Start a new crew run in the current context
+        
+        Results reported from this context (and contexts copied from it) only cover
+        tasks recorded after this call. Other runs in flight are not affected.
+        """
+        self._run.set(_Run())
+        self._task_state.set(None)
+    
+    def _encode_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a result dict to span attributes using an encoder specialized for its keys"""
+        keys = frozenset(result)
+        encoder = self._result_encoders.get(keys)
+        if encoder is None:
+            if not all(isinstance(key, str) for key in keys):
+                return {f"result.{key}": _to_attr(value) for key, value in result.items()}
+            encoder = _compile_result_encoder(keys)
+            with self._result_encoders_lock:
+                self._result_encoders[keys] = encoder
+                if len(self._result_encoders) > _MAX_RESULT_ENCODERS:
+                    self._result_encoders.popitem(last=False)
+        return encoder(result)
+    
+    @property
+    def task_results(self) -> Dict[str, Dict[str, Any]]:
+        return self.get_task_results()
+    
+    @property
+    def failed_tasks(self) -> List[Dict[str, Any]]:
+        return self.get_failed_tasks()
     
     def start_operation(self, 
                        operation_id: str, 
@@ -157,66 +357,61 @@ class OtelLogger:
                 log_data[key] = value
         
         # Log the start of the operation at INFO level
-        extra = {**log_data}
-        logger.info(f"{operation_type} STARTED | Agent: {agent_name} | Model: {model_name} | Task: {task_name or 'N/A'} | Crew: {crew_name}", 
-                   extra=extra)
+        self._log_info("%s STARTED | Agent: %s | Model: %s | Task: %s | Crew: %s",
+                       operation_type, agent_name, model_name, task_name or 'N/A', crew_name,
+                       extra=log_data)
         
         # Create OpenTelemetry span using GenAI tracer
         if operation_type == "MODEL_INVOKE":
-            # For model invocations, use the GenAI specific span
-            span = genai_tracer.start_span(
+            if _SAMPLE_RATE >= 1.0 or random.random() < _SAMPLE_RATE:
+                # For model invocations, use the GenAI specific span
+                span = genai_tracer.start_span(
+                    name=f"{operation_type}",
+                    model=model_name,
+                    attributes={
+                        "agent.name": agent_name,
+                        "operation.id": operation_id,
+                        "operation.type": operation_type
+                    }
+                )
+            else:
+                # Not sampled - skip span creation entirely
+                span = _NoopSpan({"agent.name": agent_name})
+            
+            # Record model invocation metrics regardless of sampling
+            genai_metrics.record_model_invocation_start(model_name)
+        else:
+            # For other operations, use regular span
+            span = _TRACER.start_span(
                 name=f"{operation_type}",
-                model=model_name,
+                kind=trace.SpanKind.INTERNAL,
                 attributes={
                     "agent.name": agent_name,
+                    "model.name": model_name,
                     "operation.id": operation_id,
                     "operation.type": operation_type
                 }
             )
-            
-            # Record model invocation metrics
-            genai_metrics.record_model_invocation_start(model_name)
-        else:
-            # For other operations, use regular span
-            span = trace.get_tracer(service_name).start_span(
-                name=f"{operation_type}",
-                kind=trace.SpanKind.INTERNAL
-            )
-            
-            # Add attributes to span
-            span.set_attribute("agent.name", agent_name)
-            span.set_attribute("model.name", model_name)
-            span.set_attribute("operation.id", operation_id)
-            span.set_attribute("operation.type", operation_type)
+        
+        # Collect span attributes and write them in a single batch
+        attributes = {}
         
         if task_name:
-            span.set_attribute("task.name", task_name)
+            attributes["task.name"] = task_name
             
         if crew_name:
-            span.set_attribute("crew.name", crew_name)
+            attributes["crew.name"] = crew_name
             
         # Add details to span
-        if details:
+        if details and span.is_recording():
             for key, value in details.items():
-                if isinstance(value, (str, int, float, bool)):
-                    span.set_attribute(f"details.{key}", value)
-                elif value is None:
-                    span.set_attribute(f"details.{key}", "null")
-                else:
-                    try:
-                        # Try to convert to JSON string for complex objects
-                        span.set_attribute(f"details.{key}", json.dumps(value))
-                    except:
-                        # If not serializable, convert to string
-                        span.set_attribute(f"details.{key}", str(value))
+                attributes[f"details.{key}"] = _to_attr(value)
+        
+        span.set_attributes(attributes)
         
         # Store the span for later use
-        self.spans[operation_id] = {
-            "span": span,
-            "operation_type": operation_type,
-            "model_name": model_name,
-            "start_time": time.time()
-        }
+        with self._spans_lock:
+            self._spans[operation_id] = _SpanRec(span, operation_type, model_name, time.monotonic())
     
     def end_operation(self, 
                      operation_id: str, 
@@ -234,19 +429,19 @@ class OtelLogger:
             error: Error message if the operation failed
             error_details: Additional error details
         """
-        if operation_id not in self.spans:
-            logger.warning(f"Operation {operation_id} was never started")
+        # Take the span info out of the in-flight spans
+        with self._spans_lock:
+            span_info = self._spans.pop(operation_id, None)
+        if span_info is None:
+            self._log_warning("Operation %s was never started", operation_id)
             return
         
-        # Get the span info
-        span_info = self.spans[operation_id]
-        span = span_info["span"]
-        operation_type = span_info["operation_type"]
-        model_name = span_info["model_name"]
-        start_time = span_info["start_time"]
+        span = span_info.span
+        operation_type = span_info.operation_type
+        model_name = span_info.model_name
         
         # Calculate duration
-        duration = time.time() - start_time
+        duration = time.monotonic() - span_info.start_time
         
         # Get span attributes
         agent_name = span.attributes.get("agent.name", "unknown")
@@ -275,7 +470,10 @@ class OtelLogger:
                 
             # If this is a task result, store it for later use
             if operation_type == "TASK_EXECUTION" and task_name:
-                self.task_results[task_name] = {
+                task_state = self._get_task_state()
+                if task_name not in task_state.task_results:
+                    task_state.completed_task_order.append(task_name)
+                task_state.task_results[task_name] = {
                     "status": status,
                     "result": result,
                     "agent": agent_name,
@@ -291,7 +489,7 @@ class OtelLogger:
                 
             # If this is a task error, store it for later use
             if operation_type == "TASK_EXECUTION" and task_name:
-                self.failed_tasks.append({
+                self._get_task_state().failed_tasks.append({
                     "task_name": task_name,
                     "agent_name": agent_name,
                     "error": error,
@@ -299,37 +497,29 @@ class OtelLogger:
                     "duration_seconds": duration
                 })
         
-        # Log the completion of the operation
-        log_message = f"{operation_type} {status.upper()} | Agent: {agent_name} | Model: {model_name} | Duration: {duration:.2f}s"
+        # Log the completion of the operation (formatting is deferred to the logging library)
+        log_message = "%s %s | Agent: %s | Model: %s | Duration: %.2fs"
+        log_args = [operation_type, status.upper(), agent_name, model_name, duration]
         
         if task_name:
-            log_message += f" | Task: {task_name}"
+            log_message += " | Task: %s"
+            log_args.append(task_name)
             
         if crew_name:
-            log_message += f" | Crew: {crew_name}"
-        
-        extra = {**log_data}
+            log_message += " | Crew: %s"
+            log_args.append(crew_name)
         
         if status == "completed":
-            logger.info(log_message, extra=extra)
+            self._log_info(log_message, *log_args, extra=log_data)
         else:
-            error_msg = f" | Error: {error}" if error else ""
-            logger.error(f"{log_message}{error_msg}", extra=extra)
+            if error:
+                log_message += " | Error: %s"
+                log_args.append(error)
+            self._log_error(log_message, *log_args, extra=log_data)
         
         # Add result attributes to span
-        if result:
-            for key, value in result.items():
-                if isinstance(value, (str, int, float, bool)):
-                    span.set_attribute(f"result.{key}", value)
-                elif value is None:
-                    span.set_attribute(f"result.{key}", "null")
-                else:
-                    try:
-                        # Try to convert to JSON string for complex objects
-                        span.set_attribute(f"result.{key}", json.dumps(value))
-                    except:
-                        # If not serializable, convert to string
-                        span.set_attribute(f"result.{key}", str(value))
+        if result and span.is_recording():
+            span.set_attributes(self._encode_result(result))
         
         # Set span status based on operation status
         if status == "completed":
@@ -362,9 +552,6 @@ class OtelLogger:
         
         # End the span
         span.end()
-        
-        # Remove the span from the dictionary
-        del self.spans[operation_id]
     
     def log_event(self, 
                  event_type: str, 
@@ -386,32 +573,30 @@ class OtelLogger:
             crew_name: Optional name of the crew
             level: Log level (INFO, WARNING, ERROR, DEBUG)
         """
+        # A crew kickoff begins a new run, so earlier task outcomes are not reported with it
+        if event_type == "CREW_KICKOFF_START":
+            self.start_run()
+        
         # Create a span for the event
-        with trace.get_tracer(service_name).start_as_current_span(name=f"EVENT_{event_type}") as span:
-            # Add attributes to span
-            span.set_attribute("event.type", event_type)
-            span.set_attribute("agent.name", agent_name)
-            span.set_attribute("model.name", model_name)
+        with _TRACER.start_as_current_span(name=f"EVENT_{event_type}") as span:
+            # Collect span attributes and write them in a single batch
+            attributes = {
+                "event.type": event_type,
+                "agent.name": agent_name,
+                "model.name": model_name
+            }
             
             if task_name:
-                span.set_attribute("task.name", task_name)
+                attributes["task.name"] = task_name
                 
             if crew_name:
-                span.set_attribute("crew.name", crew_name)
+                attributes["crew.name"] = crew_name
                 
             # Add details to span
             for key, value in details.items():
-                if isinstance(value, (str, int, float, bool)):
-                    span.set_attribute(f"details.{key}", value)
-                elif value is None:
-                    span.set_attribute(f"details.{key}", "null")
-                else:
-                    try:
-                        # Try to convert to JSON string for complex objects
-                        span.set_attribute(f"details.{key}", json.dumps(value))
-                    except:
-                        # If not serializable, convert to string
-                        span.set_attribute(f"details.{key}", str(value))
+                attributes[f"details.{key}"] = _to_attr(value)
+            
+            span.set_attributes(attributes)
             
             # Create structured log data
             log_data = {
@@ -431,24 +616,25 @@ class OtelLogger:
                 log_data[key] = value
             
             # Log the event at the appropriate level
-            log_message = f"EVENT: {event_type} | Agent: {agent_name} | Model: {model_name}"
+            log_message = "EVENT: %s | Agent: %s | Model: %s"
+            log_args = [event_type, agent_name, model_name]
             
             if task_name:
-                log_message += f" | Task: {task_name}"
+                log_message += " | Task: %s"
+                log_args.append(task_name)
                 
             if crew_name:
-                log_message += f" | Crew: {crew_name}"
-            
-            extra = {**log_data}
+                log_message += " | Crew: %s"
+                log_args.append(crew_name)
             
             if level == "INFO":
-                logger.info(log_message, extra=extra)
+                self._log_info(log_message, *log_args, extra=log_data)
             elif level == "WARNING":
-                logger.warning(log_message, extra=extra)
+                self._log_warning(log_message, *log_args, extra=log_data)
             elif level == "ERROR":
-                logger.error(log_message, extra=extra)
+                self._log_error(log_message, *log_args, extra=log_data)
             elif level == "DEBUG":
-                logger.debug(log_message, extra=extra)
+                self._log_debug(log_message, *log_args, extra=log_data)
     
     def log_exception(self, 
                      exception: Exception, 
@@ -468,54 +654,39 @@ class OtelLogger:
             crew_name: Optional name of the crew
             details: Additional details
         """
-        # Get stack trace
-        stack_trace = traceback.format_exc()
-        
-        # Create event details
-        event_details = {
-            "error_type": exception.__class__.__name__,
-            "error_message": str(exception),
-            "stack_trace": stack_trace
-        }
-        
-        if details:
-            event_details.update(details)
-        
         # Create a span for the exception
-        with trace.get_tracer(service_name).start_as_current_span(name=f"EXCEPTION") as span:
-            # Add attributes to span
-            span.set_attribute("error.type", exception.__class__.__name__)
-            span.set_attribute("error.message", str(exception))
-            span.set_attribute("agent.name", agent_name)
-            span.set_attribute("model.name", model_name)
+        with _TRACER.start_as_current_span(name=f"EXCEPTION") as span:
+            # Collect span attributes and write them in a single batch
+            attributes = {
+                "error.type": exception.__class__.__name__,
+                "error.message": str(exception),
+                "agent.name": agent_name,
+                "model.name": model_name
+            }
             
             if task_name:
-                span.set_attribute("task.name", task_name)
+                attributes["task.name"] = task_name
                 
             if crew_name:
-                span.set_attribute("crew.name", crew_name)
+                attributes["crew.name"] = crew_name
                 
             # Add details to span
             if details:
                 for key, value in details.items():
-                    if isinstance(value, (str, int, float, bool)):
-                        span.set_attribute(f"details.{key}", value)
-                    elif value is None:
-                        span.set_attribute(f"details.{key}", "null")
-                    else:
-                        try:
-                            # Try to convert to JSON string for complex objects
-                            span.set_attribute(f"details.{key}", json.dumps(value))
-                        except:
-                            # If not serializable, convert to string
-                            span.set_attribute(f"details.{key}", str(value))
+                    attributes[f"details.{key}"] = _to_attr(value)
+            
+            span.set_attributes(attributes)
             
             # Set span status
             span.set_status(Status(StatusCode.ERROR, str(exception)))
             
-            # Record exception
+            # Record exception (OpenTelemetry captures the traceback itself)
             span.record_exception(exception)
             
+            # Skip formatting the stack trace when ERROR records would be discarded
+            if not logger.isEnabledFor(logging.ERROR):
+                return
+            
             # Create structured log data
             log_data = {
                 "event_type": "EXCEPTION",
@@ -523,7 +694,7 @@ class OtelLogger:
                 "model": model_name,
                 "error_type": exception.__class__.__name__,
                 "error_message": str(exception),
-                "stack_trace": stack_trace
+                "stack_trace": traceback.format_exc()
             }
             
             if task_name:
@@ -538,16 +709,18 @@ class OtelLogger:
                     log_data[key] = value
             
             # Log the exception
-            log_message = f"EXCEPTION: {exception.__class__.__name__} | {str(exception)} | Agent: {agent_name} | Model: {model_name}"
+            log_message = "EXCEPTION: %s | %s | Agent: %s | Model: %s"
+            log_args = [exception.__class__.__name__, exception, agent_name, model_name]
             
             if task_name:
-                log_message += f" | Task: {task_name}"
+                log_message += " | Task: %s"
+                log_args.append(task_name)
                 
             if crew_name:
-                log_message += f" | Crew: {crew_name}"
+                log_message += " | Crew: %s"
+                log_args.append(crew_name)
             
-            extra = {**log_data}
-            logger.error(log_message, extra=extra)
+            self._log_error(log_message, *log_args, extra=log_data)
     
     def get_task_results(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -556,7 +729,10 @@ class OtelLogger:
         Returns:
             Dictionary of task results
         """
-        return self.task_results
+        task_results = {}
+        for state in self._get_run_states():
+            task_results.update(state.task_results)
+        return task_results
     
     def get_failed_tasks(self) -> List[Dict[str, Any]]:
         """
@@ -565,7 +741,10 @@ class OtelLogger:
         Returns:
             List of failed tasks
         """
-        return self.failed_tasks
+        failed_tasks = []
+        for state in self._get_run_states():
+            failed_tasks.extend(state.failed_tasks)
+        return failed_tasks
     
     def prepare_response_with_partial_results(self) -> Dict[str, Any]:
         """
@@ -575,27 +754,38 @@ class OtelLogger:
         Returns:
             Response dictionary with partial results
         """
-        response = {
-            "status": "partial_success" if self.failed_tasks else "success",
-            "completed_tasks": list(self.task_results.keys()),
-            "failed_tasks": [task["task_name"] for task in self.failed_tasks],
-            "results": {}
+        # Merge task state recorded across the execution contexts of the current run
+        task_states = self._get_run_states()
+        completed_tasks = [
+            task_name
+            for state in task_states
+            for task_name in state.completed_task_order
+        ]
+        failed_tasks = [task for state in task_states for task in state.failed_tasks]
+        
+        # Add completed task results in completion order
+        results = {
+            task_name: state.task_results[task_name].get("result", {})
+            for state in task_states
+            for task_name in state.completed_task_order
         }
         
-        # Add completed task results
-        for task_name, task_result in self.task_results.items():
-            response["results"][task_name] = task_result.get("result", {})
-        
         # Add placeholders for failed tasks
-        for task in self.failed_tasks:
-            task_name = task["task_name"]
-            response["results"][task_name] = {
-                "placeholder": f"Task {task_name} failed to complete",
+        results.update(
+            (task["task_name"], {
+                "placeholder": f"Task {task['task_name']} failed to complete",
                 "error": task["error"],
                 "error_details": task["error_details"]
-            }
-        
-        return response
+            })
+            for task in failed_tasks
+        )
+        
+        return {
+            "status": "partial_success" if failed_tasks else "success",
+            "completed_tasks": completed_tasks,
+            "failed_tasks": [task["task_name"] for task in failed_tasks],
+            "results": results
+        }
 
 # Create a singleton instance
 otel_logger = OtelLogger()
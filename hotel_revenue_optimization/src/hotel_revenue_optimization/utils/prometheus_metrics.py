@@ -5,10 +5,8 @@ Prometheus metrics exporter for AgentCore Hotel Revenue Optimization.
 import os
 import time
 import threading
-from typing import Dict, Any
-from prometheus_client import Counter, Histogram, Gauge, start_http_server, CollectorRegistry, REGISTRY
-import boto3
-import requests
+from typing import Dict, Any, Tuple
+from prometheus_client import Counter, Histogram, Gauge, start_http_server, generate_latest, CollectorRegistry
 from datetime import datetime
 
 class PrometheusMetrics:
@@ -59,9 +57,23 @@ class PrometheusMetrics:
             registry=self.registry
         )
         
+        # Labeled children are cached per label tuple to skip the labels() lookup on each call
+        self._req_children: Dict[Tuple[str, str], Any] = {}
+        self._dur_children: Dict[str, Any] = {}
+        self._task_children: Dict[Tuple[str, str], Any] = {}
+        self._model_children: Dict[Tuple[str, str], Any] = {}
+        
+        # Counter increments are aggregated here and applied to the real counters in batches
+        self._pending_counts: Dict[Tuple[str, str, str], int] = {}
+        self._pending_lock = threading.Lock()
+        self.flush_interval = float(os.environ.get('METRICS_FLUSH_INTERVAL', '0.5'))
+        self._start_flusher()
+        
         # AMP configuration
         self.amp_workspace_id = os.environ.get('AMP_WORKSPACE_ID', 'ws-faa7717b-42ab-42f5-bcfa-d0ebd8bdc442')
         self.aws_region = os.environ.get('AWS_REGION', 'us-west-2')
+        self.push_url = os.environ.get('METRICS_PUSH_URL')
+        self.push_interval = float(os.environ.get('METRICS_PUSH_INTERVAL', '15'))
         
         # Start metrics server
         self.metrics_port = int(os.environ.get('METRICS_PORT', '8080'))
@@ -77,15 +89,134 @@ class PrometheusMetrics:
             if os.environ.get('DOCKER_CONTAINER') == '1':
                 print(f"Skipping Prometheus metrics server in containerized environment")
                 return
+            # Metrics are pushed instead of scraped, so no HTTP server is needed
+            if os.environ.get('AMP_REMOTE_WRITE') == '1':
+                self._start_metrics_pusher()
+                return
             start_http_server(self.metrics_port, registry=self.registry)
             print(f"Prometheus metrics server started on port {self.metrics_port}")
         except Exception as e:
             print(f"Failed to start metrics server: {e}")
     
+    def _start_metrics_pusher(self):
+        """
+        Start the background thread that periodically pushes a metrics snapshot
+        
+        Snapshots are in Prometheus text exposition format, so METRICS_PUSH_URL must be a
+        receiver that accepts it (a Pushgateway, or a collector such as ADOT that forwards
+        to AMP). AMP's remote_write API only accepts snappy-compressed protobuf and cannot
+        be pushed to directly.
+        """
+        if not self.push_url:
+            print("AMP_REMOTE_WRITE is set but METRICS_PUSH_URL is not configured; metrics will not be exported")
+            return
+        if 'aps-workspaces' in self.push_url or 'remote_write' in self.push_url:
+            print("METRICS_PUSH_URL is a Prometheus remote_write endpoint, which does not accept text "
+                  "exposition format; push to a Pushgateway or collector instead. Metrics will not be exported")
+            return
+        
+        # Imported lazily so processes that never push metrics don't pay the import cost
+        import gzip
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        # A single pooled connection is kept alive and reused across pushes
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        
+        def push_periodically():
+            while True:
+                # Intentional: push interval for metrics export
+                time.sleep(self.push_interval)  # nosemgrep: arbitrary-sleep
+                try:
+                    self.flush()
+                    body = gzip.compress(generate_latest(self.registry))
+                    headers = {
+                        'Content-Type': 'text/plain; version=0.0.4',
+                        'Content-Encoding': 'gzip'
+                    }
+                    session.post(self.push_url, data=body, headers=headers, timeout=10)
+                except Exception as e:
+                    print(f"Failed to push metrics: {e}")
+        
+        pusher = threading.Thread(target=push_periodically, daemon=True)
+        pusher.start()
+        print(f"Pushing Prometheus metrics to {self.push_url} every {self.push_interval}s")
+    
+    def _start_flusher(self):
+        """Start the background thread that periodically applies pending counter increments"""
+        def flush_periodically():
+            while True:
+                # Intentional: batching interval for counter increments
+                time.sleep(self.flush_interval)  # nosemgrep: arbitrary-sleep
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Failed to flush metrics: {e}")
+        
+        flusher = threading.Thread(target=flush_periodically, daemon=True)
+        flusher.start()
+    
+    def _count(self, metric: str, label_a: str, label_b: str):
+        """Queue a single counter increment for the next flush"""
+        key = (metric, label_a, label_b)
+        with self._pending_lock:
+            self._pending_counts[key] = self._pending_counts.get(key, 0) + 1
+    
+    def flush(self):
+        """Apply all pending counter increments to the Prometheus counters"""
+        with self._pending_lock:
+            if not self._pending_counts:
+                return
+            pending = self._pending_counts
+            self._pending_counts = {}
+        
+        for (metric, label_a, label_b), count in pending.items():
+            if metric == 'request':
+                self._req_child(label_a, label_b).inc(count)
+            elif metric == 'task':
+                self._task_child(label_a, label_b).inc(count)
+            elif metric == 'model':
+                self._model_child(label_a, label_b).inc(count)
+    
+    def _req_child(self, agent_name: str, status: str):
+        """Get the cached request counter child for the given labels"""
+        child = self._req_children.get((agent_name, status))
+        if child is None:
+            child = self.request_counter.labels(agent_name=agent_name, status=status)
+            self._req_children[(agent_name, status)] = child
+        return child
+    
+    def _dur_child(self, agent_name: str):
+        """Get the cached request duration histogram child for the given agent"""
+        child = self._dur_children.get(agent_name)
+        if child is None:
+            child = self.request_duration.labels(agent_name=agent_name)
+            self._dur_children[agent_name] = child
+        return child
+    
+    def _task_child(self, task_name: str, status: str):
+        """Get the cached task counter child for the given labels"""
+        child = self._task_children.get((task_name, status))
+        if child is None:
+            child = self.task_counter.labels(task_name=task_name, status=status)
+            self._task_children[(task_name, status)] = child
+        return child
+    
+    def _model_child(self, model_name: str, agent_name: str):
+        """Get the cached model call counter child for the given labels"""
+        child = self._model_children.get((model_name, agent_name))
+        if child is None:
+            child = self.model_calls.labels(model_name=model_name, agent_name=agent_name)
+            self._model_children[(model_name, agent_name)] = child
+        return child
+    
     def record_request(self, agent_name: str, status: str, duration: float):
         """Record a request with status and duration"""
-        self.request_counter.labels(agent_name=agent_name, status=status).inc()
-        self.request_duration.labels(agent_name=agent_name).observe(duration)
+        self._count('request', agent_name, status)
+        self._dur_child(agent_name).observe(duration)
     
     def increment_active_sessions(self):
         """Increment active sessions counter"""
@@ -101,11 +232,11 @@ class PrometheusMetrics:
     
     def record_task(self, task_name: str, status: str):
         """Record task execution"""
-        self.task_counter.labels(task_name=task_name, status=status).inc()
+        self._count('task', task_name, status)
     
     def record_model_call(self, model_name: str, agent_name: str):
         """Record model API call"""
-        self.model_calls.labels(model_name=model_name, agent_name=agent_name).inc()
+        self._count('model', model_name, agent_name)
     
     def get_metrics_endpoint(self):
         """Get the metrics endpoint URL"""
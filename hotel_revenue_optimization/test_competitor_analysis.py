@@ -6,13 +6,11 @@ import sys
 import os
 sys.path.append('src')
 
-from hotel_revenue_optimization.utils.nlp_processor import NLPProcessor
+from hotel_revenue_optimization.utils.nlp_processor import nlp_processor as nlp
 
 def test_competitor_analysis_detection():
     """Test that competitor analysis instructions are properly detected"""
     
-    nlp = NLPProcessor()
-    
     # Test cases
     test_cases = [
         {
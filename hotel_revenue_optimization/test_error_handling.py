@@ -4,7 +4,16 @@ Test script for improved error handling with irrelevant queries and insufficient
 """
 
 import json
-from src.hotel_revenue_optimization.main import run
+from concurrent.futures import ThreadPoolExecutor
+from run_cache import cached_run as run
+
+# Agent calls are dominated by remote model latency, so queries in a batch run concurrently
+MAX_WORKERS = 8
+
+def run_batch(queries):
+    """Run all queries concurrently and return their responses in input order"""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return list(executor.map(run, queries))
 
 def test_irrelevant_queries():
     """Test with irrelevant queries that should be politely redirected"""
@@ -20,15 +29,19 @@ def test_irrelevant_queries():
     
     print("=== Testing Irrelevant Queries ===\n")
     
-    for i, query in enumerate(irrelevant_queries, 1):
+    responses = run_batch(irrelevant_queries)
+    
+    for i, (query, response) in enumerate(zip(irrelevant_queries, responses), 1):
         print(f"Test {i}: {query['prompt']}")
-        response = run(query)
         
-        print(f"Status: {response.get('status')}")
-        print(f"Error Type: {response.get('error_type', 'N/A')}")
-        print(f"Message: {response.get('message', 'N/A')}")
+        status, error_type, message, capabilities = (
+            response.get(key) for key in ('status', 'error_type', 'message', 'capabilities')
+        )
+        print(f"Status: {status}")
+        print(f"Error Type: {error_type or 'N/A'}")
+        print(f"Message: {message or 'N/A'}")
         
-        if response.get('capabilities'):
+        if capabilities:
             print("Capabilities shown: ✅")
         else:
             print("Capabilities shown: ❌")
@@ -47,17 +60,21 @@ def test_insufficient_information():
     
     print("\n=== Testing Insufficient Information ===\n")
     
-    for i, query in enumerate(insufficient_queries, 1):
+    responses = run_batch(insufficient_queries)
+    
+    for i, (query, response) in enumerate(zip(insufficient_queries, responses), 1):
         print(f"Test {i}: {query['prompt']}")
-        response = run(query)
         
-        print(f"Status: {response.get('status')}")
-        print(f"Error Type: {response.get('error_type', 'N/A')}")
-        print(f"Message: {response.get('message', 'N/A')}")
+        status, error_type, message, required_info, examples = (
+            response.get(key) for key in ('status', 'error_type', 'message', 'required_info', 'examples')
+        )
+        print(f"Status: {status}")
+        print(f"Error Type: {error_type or 'N/A'}")
+        print(f"Message: {message or 'N/A'}")
         
-        if response.get('required_info'):
+        if required_info:
             print("Required info shown: ✅")
-            print(f"Examples provided: {len(response.get('examples', []))}")
+            print(f"Examples provided: {len(examples or [])}")
         else:
             print("Required info shown: ❌")
         
@@ -72,9 +89,10 @@ def test_valid_query():
     print(f"Test: {valid_query['prompt']}")
     
     response = run(valid_query)
-    print(f"Status: {response.get('status')}")
+    status = response.get('status')
+    print(f"Status: {status}")
     
-    if response.get('status') == 'success':
+    if status == 'success':
         print("✅ Valid query processed successfully")
     else:
         print("❌ Valid query failed")
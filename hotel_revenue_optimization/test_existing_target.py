@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
 import requests
 import json
+from requests.adapters import HTTPAdapter
+
+# Shared session so repeated gateway probes reuse pooled TCP/TLS connections
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+session.headers.update({"Content-Type": "application/json"})
 
 def test_gateway_target():
     """Test existing gateway target directly"""
@@ -23,9 +29,8 @@ def test_gateway_target():
     print(f"Payload: {json.dumps(payload, indent=2)}")
     
     try:
-        response = requests.post(
+        response = session.post(
             f"{gateway_url}/mcp",
-            headers={"Content-Type": "application/json"},
             json=payload,
             timeout=30
         )
@@ -4,7 +4,8 @@ Test script to verify that inputs are being processed correctly.
 """
 
 import json
-from src.hotel_revenue_optimization.main import run
+from run_cache import cached_run as run
+from report_terms import find_terms
 
 def test_structured_input():
     """Test with structured JSON input"""
@@ -40,17 +41,18 @@ def test_structured_input():
         print(report[:1000] + "..." if len(report) > 1000 else report)
         
         # Check if the report contains the correct hotel information
-        if "Your Business Hotel" in report:
+        found = find_terms(report, ["Your Business Hotel", "New York, NY", "$280"])
+        if "Your Business Hotel" in found:
             print("\n✅ SUCCESS: Report contains the correct hotel name!")
         else:
             print("\n❌ ERROR: Report does not contain the correct hotel name!")
             
-        if "New York, NY" in report:
+        if "New York, NY" in found:
             print("✅ SUCCESS: Report contains the correct location!")
         else:
             print("❌ ERROR: Report does not contain the correct location!")
             
-        if "$280" in report:
+        if "$280" in found:
             print("✅ SUCCESS: Report contains the correct ADR!")
         else:
             print("❌ ERROR: Report does not contain the correct ADR!")
@@ -82,17 +84,18 @@ def test_natural_language_input():
         print(report[:1000] + "..." if len(report) > 1000 else report)
         
         # Check if the report contains the correct hotel information
-        if "Seaside Resort" in report:
+        found = find_terms(report, ["Seaside Resort", "San Francisco", "$350"])
+        if "Seaside Resort" in found:
             print("\n✅ SUCCESS: Report contains the correct hotel name!")
         else:
             print("\n❌ ERROR: Report does not contain the correct hotel name!")
             
-        if "San Francisco" in report:
+        if "San Francisco" in found:
             print("✅ SUCCESS: Report contains the correct location!")
         else:
             print("❌ ERROR: Report does not contain the correct location!")
             
-        if "$350" in report:
+        if "$350" in found:
             print("✅ SUCCESS: Report contains the correct ADR!")
         else:
             print("❌ ERROR: Report does not contain the correct ADR!")
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import json
-import subprocess
 
 def test_mcp_tool():
     """Test the actual MCP tool call"""
@@ -15,21 +14,12 @@ def test_mcp_tool():
     print(f"Payload: {json.dumps(payload)}")
     
     try:
-        result = subprocess.run([
-            'python', '-c', '''
-import sys
-sys.path.append("src")
-from hotel_revenue_optimization.main import handler
-
-payload = ''' + json.dumps(payload) + '''
-result = handler(payload, None)
-print("RESULT:", result)
-'''
-        ], capture_output=True, text=True, cwd='/Users/patilag/AgentCore/hotel_revenue_optimization')
+        # Call the entrypoint in-process instead of spawning a new interpreter,
+        # so the agent's heavy imports are loaded once and reused across calls
+        from src.hotel_revenue_optimization.main import run
         
-        print(f"Exit code: {result.returncode}")
-        print(f"STDOUT: {result.stdout}")
-        print(f"STDERR: {result.stderr}")
+        result = run(payload)
+        print("RESULT:", result)
         
     except Exception as e:
         print(f"Error: {e}")
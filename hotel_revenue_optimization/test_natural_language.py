@@ -7,8 +7,12 @@ This script demonstrates how to invoke the agent with different types of natural
 import sys
 import json
 import os
-from src.hotel_revenue_optimization.main import run
-from src.hotel_revenue_optimization.utils.nlp_processor import NLPProcessor
+from run_cache import cached_run as run
+from src.hotel_revenue_optimization.utils.nlp_processor import nlp_processor as nlp
+
+# BATCH=1 runs all prompts back-to-back without waiting for Enter; --quiet skips report previews
+BATCH = os.environ.get('BATCH', '0') == '1'
+QUIET = '--quiet' in sys.argv
 
 def print_separator():
     print("\n" + "="*80 + "\n")
@@ -41,16 +45,17 @@ def test_natural_language_prompts():
         "Help me increase RevPAR"
     ]
     
+    # Extract and serialize every prompt up front so each dict is encoded once
+    extracted_json = [json.dumps(nlp.process_input(prompt), indent=2) for prompt in prompts]
+    
     # Process each prompt
     for i, prompt in enumerate(prompts):
         print(f"Test {i+1}: {prompt}")
         print_separator()
         
         # First, show what the NLP processor extracts
-        nlp = NLPProcessor()
-        extracted = nlp.process_input(prompt)
         print("NLP Processor extracted:")
-        print(json.dumps(extracted, indent=2))
+        print(extracted_json[i])
         print_separator()
         
         # Then run the actual agent
@@ -72,7 +77,7 @@ def test_natural_language_prompts():
                 print("\nAgent completed successfully!")
                 
                 # Check if there's a report
-                if "report" in response:
+                if "report" in response and not QUIET:
                     report_preview = response["report"][:500] + "..." if len(response["report"]) > 500 else response["report"]
                     print("\nReport preview:")
                     print(report_preview)
@@ -81,8 +86,9 @@ def test_natural_language_prompts():
             print(response)
         
         print_separator()
-        input("Press Enter to continue to the next test...")
-        print_separator()
+        if not BATCH:
+            input("Press Enter to continue to the next test...")
+            print_separator()
 
 if __name__ == "__main__":
     test_natural_language_prompts()
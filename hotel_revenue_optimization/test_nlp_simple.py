@@ -10,22 +10,17 @@ from typing import Dict, Any, Union, Optional
 
 # Simplified NLP processor test
 class TestNLPProcessor:
-    def __init__(self):
-        # Optional instruction patterns
-        self.optional_instructions = {
-            r'include\s+competitor\s+analysis': 'include_competitor_analysis',
-            r'with\s+competitor\s+analysis': 'include_competitor_analysis',
-            r'add\s+competitor\s+analysis': 'include_competitor_analysis',
-            r'competitor\s+analysis\s+included': 'include_competitor_analysis'
-        }
+    # Optional instruction patterns fused into one regex so the text is scanned once
+    _opt_re = re.compile(
+        r'(?i)(?:include|with|add)\s+competitor\s+analysis|competitor\s+analysis\s+included'
+    )
     
     def _detect_optional_instructions(self, text: str) -> Dict[str, bool]:
         """Detect optional instructions in the input text."""
         instructions = {}
         
-        for pattern, instruction_key in self.optional_instructions.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                instructions[instruction_key] = True
+        if self._opt_re.search(text):
+            instructions['include_competitor_analysis'] = True
         
         return instructions
     
@@ -20,19 +20,25 @@ def test_output_difference():
         "prompt": "Optimize revenue for Grand Pacific Resort in Miami, FL with $245 ADR and 72% occupancy, targeting $195 RevPAR. Include competitor analysis."
     }
     
+    # Serialize each input once and reuse the strings below
+    without_pretty = json.dumps(test_without, indent=2)
+    with_pretty = json.dumps(test_with, indent=2)
+    without_compact = json.dumps(test_without)
+    with_compact = json.dumps(test_with)
+    
     print("🧪 Testing Output Differences")
     print("=" * 50)
     
     print("\n📋 Test Input WITHOUT Competitor Analysis:")
-    print(json.dumps(test_without, indent=2))
+    print(without_pretty)
     
     print("\n📋 Test Input WITH Competitor Analysis:")
-    print(json.dumps(test_with, indent=2))
+    print(with_pretty)
     
     print("\n✅ Test inputs prepared!")
     print("\n📝 To test manually:")
-    print("1. Run: agentcore invoke --local '" + json.dumps(test_without) + "'")
-    print("2. Run: agentcore invoke --local '" + json.dumps(test_with) + "'")
+    print("1. Run: agentcore invoke --local '" + without_compact + "'")
+    print("2. Run: agentcore invoke --local '" + with_compact + "'")
     print("3. Compare the outputs - the second should include detailed competitor analysis sections")
     
     return True
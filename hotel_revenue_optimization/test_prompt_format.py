@@ -4,7 +4,8 @@ Test script to verify that the system handles the {"prompt": "..."} format corre
 """
 
 import json
-from src.hotel_revenue_optimization.main import run
+from run_cache import cached_run as run
+from report_terms import find_terms
 
 def test_prompt_format():
     """Test with the exact format that the UI is sending"""
@@ -41,8 +42,9 @@ def test_prompt_format():
         
         print("\nContent verification:")
         all_passed = True
+        found = find_terms(report, [term for term, _ in checks])
         for search_term, description in checks:
-            if search_term in report:
+            if search_term in found:
                 print(f"✅ {description}: Found '{search_term}'")
             else:
                 print(f"❌ {description}: '{search_term}' NOT FOUND")
@@ -101,8 +103,9 @@ def test_message_format():
         
         print("\nContent verification:")
         all_passed = True
+        found = find_terms(report, [term for term, _ in checks])
         for search_term, description in checks:
-            if search_term in report:
+            if search_term in found:
                 print(f"✅ {description}: Found '{search_term}'")
             else:
                 print(f"❌ {description}: '{search_term}' NOT FOUND")
@@ -1,14 +1,44 @@
 import os
+import base64
 import logging
+import functools
 from flask import Flask
 from flask_wtf.csrf import CSRFProtect
+from werkzeug.routing import BaseConverter
 from app.config import config
+from app.logging_config import configure_logging
 from datetime import datetime
+from zoneinfo import ZoneInfo
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Display timezone, resolved once at import
+_ET = ZoneInfo('America/New_York')
+
+@functools.lru_cache(maxsize=1024)
+def _format_datetime_str(value):
+    """Format an ISO datetime string in Eastern Time (cached per string)"""
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        # Convert to Eastern Time for display
+        return dt.astimezone(_ET).strftime('%Y-%m-%d %H:%M %Z')
+    except:
+        try:
+            # Fallback for simple datetime strings
+            dt = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+            return dt.strftime('%Y-%m-%d %H:%M EST')
+        except:
+            return value
+
+class ISOTimestampConverter(BaseConverter):
+    """URL converter for history timestamps, so malformed values 404 before any DynamoDB lookup"""
+    regex = r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?'
+
 def create_app(config_name=None):
+    # Configure logging once for all app modules
+    configure_logging()
+    
     # Create and configure the app
     logger.info("Creating Flask application")
     app = Flask(__name__, instance_relative_config=True)
@@ -16,7 +46,19 @@ def create_app(config_name=None):
     # Load the configuration
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'default')
-    app.config.from_object(config[config_name])
+    config_class = config[config_name]
+    config_class.validate()
+    app.config.from_object(config_class)
+    
+    # Precompute the Cognito Basic auth header used by the OAuth token exchange
+    client_id = app.config.get('COGNITO_CLIENT_ID') or app.config.get('COGNITO_APP_CLIENT_ID')
+    client_secret = app.config.get('COGNITO_CLIENT_SECRET', '')
+    credentials = base64.b64encode(f"{client_id}:{client_secret}".encode('utf-8')).decode('utf-8')
+    app.config['_COGNITO_BASIC_AUTH'] = f"Basic {credentials}"
+    
+    # Warm the Cognito URL templates so the first login doesn't build them
+    from app.auth.cognito import preload_cognito
+    preload_cognito(app)
     
     # Add template filters
     # nosemgrep: useless-inner-function
@@ -24,19 +66,7 @@ def create_app(config_name=None):
     def format_datetime(value):
         """Format ISO datetime string for display with timezone"""
         if isinstance(value, str):
-            try:
-                dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                # Convert to Eastern Time for display
-                from zoneinfo import ZoneInfo
-                et = dt.astimezone(ZoneInfo('America/New_York'))
-                return et.strftime('%Y-%m-%d %H:%M %Z')
-            except:
-                try:
-                    # Fallback for simple datetime strings
-                    dt = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
-                    return dt.strftime('%Y-%m-%d %H:%M EST')
-                except:
-                    return value
+            return _format_datetime_str(value)
         return value
     
     # Ensure the instance folder exists
@@ -55,6 +85,9 @@ def create_app(config_name=None):
     # Initialize CSRF protection
     csrf = CSRFProtect(app)
     
+    # Register URL converters before the blueprints that use them
+    app.url_map.converters['iso'] = ISOTimestampConverter
+    
     # Register blueprints
     from app.main import bp as main_bp
     app.register_blueprint(main_bp)
@@ -1,7 +1,10 @@
 import json
 import logging
+import threading
 import time
 import uuid
+from collections import defaultdict
+from functools import wraps
 import boto3
 import requests
 from datetime import datetime
@@ -10,33 +13,99 @@ from botocore.auth import SigV4Auth
 from botocore.awsrequest import AWSRequest
 from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, ConnectTimeoutError, ReadTimeoutError
+from botocore.response import StreamingBody
 
-# Configure logging
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Configure logging (handlers and level are set once by app.logging_config)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-# Create console handler if it doesn't exist
-if not logger.handlers:
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+# Prompt sent for structured form submissions (missing fields render as empty strings)
+_STRUCT_PROMPT = "Optimize revenue for a {star_rating}-star {hotel_type} hotel in {location} during {season} season with current occupancy rate of {occupancy_rate}%"
 
-def invoke_agentcore(payload, session_id=None):
+# boto3 clients are thread-safe and expensive to build, so keep one per region/connection settings
+_CLIENT_CACHE = {}
+_client_lock = threading.Lock()
+
+def _get_client(region, connect_timeout, read_timeout, max_pool_connections):
+    """Return the cached Bedrock AgentCore client for these settings, creating it on first use"""
+    key = (region, connect_timeout, read_timeout, max_pool_connections)
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        with _client_lock:
+            client = _CLIENT_CACHE.get(key)
+            if client is None:
+                # Configure boto3 with timeouts, a larger keep-alive pool and client-side throttling
+                boto_config = BotoConfig(
+                    connect_timeout=connect_timeout,
+                    read_timeout=read_timeout,
+                    retries={'max_attempts': 2, 'mode': 'adaptive'},
+                    max_pool_connections=max_pool_connections,
+                    tcp_keepalive=True
+                )
+                client = boto3.client(
+                    'bedrock-agentcore',
+                    region_name=region,
+                    config=boto_config
+                )
+                _CLIENT_CACHE[key] = client
+    return client
+
+def log_duration(name):
+    """Log how long the wrapped call took; the clock is only read when INFO logging is enabled"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not logger.isEnabledFor(logging.INFO):
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            logger.info("%s request completed in %.2fms", name, (time.perf_counter() - start) * 1000)
+            return result
+        return wrapper
+    return decorator
+
+def _json_dumps(obj):
+    """Encode obj as UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+# orjson.loads accepts str or bytes and raises a json.JSONDecodeError subclass
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+def _iter_sse_data(body, chunk_size=65536):
+    """Yield the decoded data payload of each server-sent event line in the response body"""
+    # Read large chunks into one buffer and split on newlines with a cursor, so partial
+    # lines are never re-scanned and only the data payloads are decoded
+    buffer = bytearray()
+    for chunk in body.iter_chunks(chunk_size):
+        buffer += chunk
+        start = 0
+        end = buffer.find(b"\n", start)
+        while end != -1:
+            if buffer.startswith(b"data: ", start, end):
+                yield buffer[start + 6:end].rstrip(b"\r").decode("utf-8")
+            start = end + 1
+            end = buffer.find(b"\n", start)
+        del buffer[:start]
+    if buffer.startswith(b"data: "):
+        yield buffer[6:].rstrip(b"\r").decode("utf-8")
+
+def _start_invocation(payload, session_id=None):
     """
-    Invoke the AgentCore endpoint with IAM authentication and timeout handling
+    Send the payload to the AgentCore runtime and return the raw invoke_agent_runtime response
     
     Args:
         payload (dict): The payload to send to the AgentCore endpoint
         session_id (str): Optional session ID for AgentCore
         
     Returns:
-        dict: The response from the AgentCore endpoint
+        dict: The boto3 response, with the body still unread
     """
-    # Start timing the request
-    start_time = time.time()
-    
     # Get the AgentCore runtime ARN from the app config
     agent_runtime_arn = current_app.config.get('AGENTCORE_RUNTIME_ARN')
     if not agent_runtime_arn:
@@ -46,58 +115,43 @@ def invoke_agentcore(payload, session_id=None):
     query_type = payload.get("query_type", "unknown")
     
     # Log the request details
-    logger.info(f"Invoking AgentCore with payload type: {query_type}")
-    logger.info(f"AgentCore Runtime ARN: {agent_runtime_arn}")
+    logger.info("Invoking AgentCore with payload type: %s", query_type)
+    logger.info("AgentCore Runtime ARN: %s", agent_runtime_arn)
     
     logger.info("Attempting to use boto3 client for AgentCore invocation")
     # Get the region from the app config
     region = current_app.config.get('AWS_REGION', 'us-west-2')
-    logger.info(f"Using AWS region: {region}")
+    logger.info("Using AWS region: %s", region)
     
     # Get timeout configurations
     connect_timeout = current_app.config.get('AWS_CONNECT_TIMEOUT', 10)
     read_timeout = current_app.config.get('AWS_READ_TIMEOUT', 120)
     agentcore_timeout = current_app.config.get('AGENTCORE_TIMEOUT', 120)
+    max_pool_connections = current_app.config.get('AWS_MAX_POOL', 50)
     
-    logger.info(f"Timeout settings - Connect: {connect_timeout}s, Read: {read_timeout}s, AgentCore: {agentcore_timeout}s")
-    
-    # Configure boto3 with timeouts
-    boto_config = BotoConfig(
-        connect_timeout=connect_timeout,
-        read_timeout=read_timeout,
-        retries={'max_attempts': 2, 'mode': 'standard'}
-    )
+    logger.info("Timeout settings - Connect: %ss, Read: %ss, AgentCore: %ss", connect_timeout, read_timeout, agentcore_timeout)
     
-    # Initialize the Bedrock AgentCore client with timeout configuration
-    agent_core_client = boto3.client(
-        'bedrock-agentcore', 
-        region_name=region,
-        config=boto_config
-    )
+    # Reuse the Bedrock AgentCore client (and its connection pool) across invocations
+    agent_core_client = _get_client(region, connect_timeout, read_timeout, max_pool_connections)
     
     # Prepare the payload
     # Format the payload as expected by AgentCore
     if query_type == "natural_language":
-        input_text = json.dumps({"prompt": payload.get("query", "")}).encode()
+        input_text = _json_dumps({"prompt": payload.get("query", "")})
     else:
         # For structured form, convert to a natural language prompt
-        hotel_type = payload.get("hotel_type", "")
-        location = payload.get("location", "")
-        season = payload.get("season", "")
-        star_rating = payload.get("star_rating", "")
-        occupancy_rate = payload.get("occupancy_rate", "")
-        
-        prompt = f"Optimize revenue for a {star_rating}-star {hotel_type} hotel in {location} during {season} season with current occupancy rate of {occupancy_rate}%"
-        input_text = json.dumps({"prompt": prompt}).encode()
+        input_text = _json_dumps({"prompt": _STRUCT_PROMPT.format_map(defaultdict(str, payload))})
     
-    logger.info(f"Prepared payload for AgentCore: {input_text.decode()}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Prepared payload for AgentCore: %s", input_text.decode())
     
     # Use provided session ID or generate a new one
+    # (keep the hyphenated form: runtimeSessionId must be at least 33 characters, uuid4().hex is 32)
     if not session_id:
         session_id = str(uuid.uuid4())
     
     # Invoke the agent runtime with timeout handling
-    logger.info(f"Invoking AgentCore runtime with {agentcore_timeout}s timeout")
+    logger.info("Invoking AgentCore runtime with %ss timeout", agentcore_timeout)
     
     try:
         response = agent_core_client.invoke_agent_runtime(
@@ -105,65 +159,120 @@ def invoke_agentcore(payload, session_id=None):
             runtimeSessionId=session_id,
             payload=input_text
         )
-        logger.info(f"Received response from AgentCore")
+        logger.info("Received response from AgentCore")
     except (ConnectTimeoutError, ReadTimeoutError) as timeout_error:
-        logger.error(f"Timeout error invoking AgentCore: {str(timeout_error)}")
+        logger.error("Timeout error invoking AgentCore: %s", timeout_error)
         raise Exception(f"AgentCore request timed out after {agentcore_timeout} seconds")
     except ClientError as client_error:
         error_code = client_error.response.get('Error', {}).get('Code', 'Unknown')
         error_message = client_error.response.get('Error', {}).get('Message', str(client_error))
-        logger.error(f"AWS Client Error ({error_code}): {error_message}")
+        logger.error("AWS Client Error (%s): %s", error_code, error_message)
         raise Exception(f"AgentCore API error: {error_message}")
     except Exception as invoke_error:
-        logger.error(f"Unexpected error invoking AgentCore: {str(invoke_error)}")
+        logger.error("Unexpected error invoking AgentCore: %s", invoke_error)
         raise
     
-    # Process the response
+    return response
+
+def invoke_agentcore_stream(payload, session_id=None):
+    """
+    Invoke the AgentCore endpoint and yield response content as it arrives
+    
+    Event-stream responses are yielded one data payload at a time; any other
+    content type is read in full and yielded as a single chunk.
+    
+    Args:
+        payload (dict): The payload to send to the AgentCore endpoint
+        session_id (str): Optional session ID for AgentCore
+        
+    Yields:
+        str: Response content chunks
+    """
+    response = _start_invocation(payload, session_id)
+    
+    if "text/event-stream" in response.get("contentType", ""):
+        yield from _iter_sse_data(response["response"])
+    else:
+        yield _read_response_content(response)[0]
+
+@log_duration("AgentCore")
+def invoke_agentcore(payload, session_id=None):
+    """
+    Invoke the AgentCore endpoint with IAM authentication and timeout handling
+    
+    Args:
+        payload (dict): The payload to send to the AgentCore endpoint
+        session_id (str): Optional session ID for AgentCore
+        
+    Returns:
+        dict: The response from the AgentCore endpoint
+    """
+    response = _start_invocation(payload, session_id)
+    response_content, response_json = _read_response_content(response)
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Response content preview: %s...", response_content[:200])  # Log first 200 chars
+    
+    return _build_response_data(response_content, response_json)
+
+# Content types other than event-stream/JSON that have already been logged
+_unexpected_content_types = set()
+
+def _read_response_content(response):
+    """
+    Read the full response body as text, unwrapping JSON {"response": ...} envelopes
+    
+    Returns:
+        tuple: The response content, and the already-parsed JSON body when the content
+            is that body (None otherwise, so callers know to parse it themselves)
+    """
     response_content = ""
+    response_json = None
     if "text/event-stream" in response.get("contentType", ""):
         # Handle streaming response
-        content = []
-        for line in response["response"].iter_lines(chunk_size=10):
-            if line:
-                line = line.decode("utf-8")
-                if line.startswith("data: "):
-                    line = line[6:]
-                    content.append(line)
-        response_content = "\n".join(content)
-        logger.info(f"Processed streaming response, length: {len(response_content)}")
+        response_content = "\n".join(_iter_sse_data(response["response"]))
+        logger.info("Processed streaming response, length: %s", len(response_content))
     
     elif response.get("contentType") == "application/json":
-        # Handle standard JSON response
-        content = []
-        for chunk in response.get("response", []):
-            content.append(chunk.decode('utf-8'))
-        response_content = ''.join(content)
-        logger.info(f"Processed JSON response, length: {len(response_content)}")
+        # Handle standard JSON response: join the raw chunks and parse the bytes directly
+        raw_bytes = b''.join(response.get("response", []))
+        logger.info("Processed JSON response, length: %s", len(raw_bytes))
         
         # Try to parse as JSON
         try:
-            response_json = json.loads(response_content)
-            if isinstance(response_json, dict) and "response" in response_json:
-                response_content = response_json["response"]
-        except:
-            pass
+            response_json = _json_loads(raw_bytes)
+        except ValueError:
+            response_json = None
+        
+        if isinstance(response_json, dict) and "response" in response_json:
+            response_content = response_json["response"]
+            response_json = None
+        else:
+            # Only decode to text when the body itself is the content
+            response_content = raw_bytes.decode('utf-8')
     
     else:
-        # Handle other response types
-        if 'response' in response:
-            response_obj = response['response']
-            if hasattr(response_obj, 'read') and callable(response_obj.read):
-                response_content = response_obj.read().decode('utf-8')
-            else:
-                response_content = str(response_obj)
-        else:
-            response_content = str(response)
+        # Handle other response types (the body is still a StreamingBody per the API shape)
+        content_type = response.get("contentType")
+        if content_type not in _unexpected_content_types:
+            _unexpected_content_types.add(content_type)
+            logger.warning("Unexpected AgentCore response content type: %s", content_type)
         
-    logger.info(f"Response content preview: {response_content[:200]}...")  # Log first 200 chars
+        response_obj = response.get('response')
+        if isinstance(response_obj, StreamingBody):
+            response_content = response_obj.read().decode('utf-8')
+        else:
+            response_content = str(response if response_obj is None else response_obj)
     
-    # Try to parse the response content as JSON to extract the report
+    return response_content, response_json
+
+def _build_response_data(response_content, response_json=None):
+    """Shape the response content into the UI result dict, extracting the report when present"""
+    # Try to parse the response content as JSON to extract the report (unless already parsed)
     try:
-        response_json = json.loads(response_content)
+        # Only a JSON object can carry a report, so plain markdown skips the parse entirely
+        if response_json is None and isinstance(response_content, str) and response_content.lstrip()[:1] == '{':
+            response_json = _json_loads(response_content)
         if isinstance(response_json, dict):
             # Check if there's a report field in the JSON
             if "report" in response_json:
@@ -182,13 +291,9 @@ def invoke_agentcore(payload, session_id=None):
                     "failed_tasks": failed_tasks
                 }
                 
-                # Calculate duration
-                duration_ms = (time.time() - start_time) * 1000
-                logger.info(f"Request completed in {duration_ms:.2f}ms")
-                
                 return response_data
     except Exception as json_e:
-        logger.warning(f"Failed to parse response as JSON or extract report: {str(json_e)}")
+        logger.warning("Failed to parse response as JSON or extract report: %s", json_e)
     
     # If we couldn't extract a report, use the full response as markdown content
     response_data = {
@@ -199,8 +304,4 @@ def invoke_agentcore(payload, session_id=None):
         "failed_tasks": []
     }
     
-    # Calculate duration
-    duration_ms = (time.time() - start_time) * 1000
-    logger.info(f"Request completed in {duration_ms:.2f}ms")
-    
     return response_data
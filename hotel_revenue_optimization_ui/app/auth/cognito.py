@@ -1,21 +1,48 @@
 import json
 import time
+import base64
 import logging
-from functools import wraps
+from functools import wraps, lru_cache
 from flask import request, redirect, url_for, session, current_app, jsonify
 from urllib.parse import quote
 
-# Configure logging
+# Configure logging (handlers and level are set once by app.logging_config)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-# Create console handler if it doesn't exist
-if not logger.handlers:
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+# Session keys written at login and removed together on logout or token expiry
+_AUTH_KEYS = ('user', 'id_token', 'access_token', 'token_expiration')
+
+def clear_auth_session():
+    """Remove the authentication keys from the session, touching only keys that are present"""
+    for key in [key for key in _AUTH_KEYS if key in session]:
+        del session[key]
+
+@lru_cache(maxsize=1024)
+def _decode_jwt_payload(token):
+    """
+    Decode the claims of a JWT without verifying its signature
+    
+    Results are cached per token string, so repeated checks of the same token skip the
+    base64 and JSON work. The returned dict is shared and must not be modified.
+    
+    Args:
+        token (str): The encoded JWT
+        
+    Returns:
+        dict: The token claims
+        
+    Raises:
+        ValueError: If the token is not a well-formed JWT
+    """
+    token_parts = token.split('.')
+    if len(token_parts) < 2:
+        raise ValueError("Invalid token format")
+    
+    # JWT segments are unpadded base64url; restore padding to a multiple of 4
+    payload = token_parts[1]
+    payload += '=' * (-len(payload) % 4)
+    
+    return json.loads(base64.urlsafe_b64decode(payload))
 
 def token_required(f):
     """
@@ -25,7 +52,7 @@ def token_required(f):
     def decorated(*args, **kwargs):
         # Check if authentication is disabled for local development
         if current_app.config.get('DISABLE_AUTH', False):
-            logger.info("Authentication is disabled for local development")
+            logger.debug("Authentication is disabled for local development")
             # Add a mock user to the session for development ONLY in local development
             if 'user' not in session:
                 session['user'] = {
@@ -37,32 +64,18 @@ def token_required(f):
                 }
             return f(*args, **kwargs)
         
-        # Check if user is in session
+        # Fast path: a session user whose token has not expired goes straight through without
+        # header or cookie parsing (sessions with no recorded expiration are accepted)
         if 'user' in session:
-            logger.info(f"User found in session: {session.get('user', {}).get('email')}")
-            # Check if token is still valid
-            if 'token_expiration' in session:
-                if session['token_expiration'] > time.time():
-                    logger.info("Token is still valid")
-                    return f(*args, **kwargs)
-                else:
-                    logger.info("Token has expired")
-            else:
-                # No expiration set, assume token is valid only if we have user info
-                if session.get('user', {}).get('sub') and session.get('user', {}).get('email'):
-                    logger.info("No token expiration found, but user info exists")
-                    return f(*args, **kwargs)
-                else:
-                    logger.info("No token expiration and incomplete user info")
+            expiration = session.get('token_expiration')
+            if expiration is None or expiration > time.time():
                 return f(*args, **kwargs)
+            logger.info("Token has expired")
         else:
             logger.info("No user found in session")
         
         # Token expired or not found, clear session
-        session.pop('user', None)
-        session.pop('id_token', None)
-        session.pop('access_token', None)
-        session.pop('token_expiration', None)
+        clear_auth_session()
         token = None
         
         # Check Authorization header
@@ -85,13 +98,57 @@ def token_required(f):
             else:
                 return redirect(url_for('auth.login', next=quote(request.url)))
         
-        # In a real application, we would verify the token here
-        # For local development, we'll just accept any token
+        # In a real application, we would verify the token signature here
+        # For now, reject tokens that cannot be decoded or have expired (claims are cached per token)
+        try:
+            claims = _decode_jwt_payload(token)
+        except Exception as e:
+            logger.info("Could not decode token: %s", e)
+            claims = None
+        
+        if not claims or ('exp' in claims and claims['exp'] <= time.time()):
+            logger.info("Token is invalid or expired")
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return jsonify({'error': 'Unauthorized', 'message': 'Authentication required'}), 401
+            else:
+                return redirect(url_for('auth.login', next=quote(request.url)))
         
         return f(*args, **kwargs)
     
     return decorated
 
+@lru_cache(maxsize=8)
+def _cognito_url_templates(cognito_domain, client_id):
+    """Build the login and logout URL templates once per Cognito domain/client pair"""
+    # Ensure the domain has the correct format
+    if not cognito_domain.startswith('http'):
+        cognito_domain = f"https://{cognito_domain}"
+    
+    login_template = (
+        f"{cognito_domain}/login?"
+        f"client_id={client_id}&"
+        f"response_type=code&"
+        f"scope=email+openid+profile&"
+        f"redirect_uri={{redirect_uri}}"
+    )
+    logout_template = (
+        f"{cognito_domain}/logout?"
+        f"client_id={client_id}&"
+        f"redirect_uri={{redirect_uri}}"
+    )
+    return login_template, logout_template
+
+def preload_cognito(app):
+    """Build the Cognito login/logout URL templates at startup rather than on the first login"""
+    cognito_domain = app.config.get('COGNITO_DOMAIN')
+    client_id = app.config.get('COGNITO_CLIENT_ID') or app.config.get('COGNITO_APP_CLIENT_ID')
+    if cognito_domain and client_id:
+        _cognito_url_templates(cognito_domain, client_id)
+
+def _cognito_client_id():
+    """Client ID from either COGNITO_CLIENT_ID or COGNITO_APP_CLIENT_ID"""
+    return current_app.config.get('COGNITO_CLIENT_ID') or current_app.config.get('COGNITO_APP_CLIENT_ID')
+
 def get_cognito_login_url(redirect_uri):
     """
     Get the Cognito login URL
@@ -102,40 +159,23 @@ def get_cognito_login_url(redirect_uri):
     Returns:
         str: Cognito login URL
     """
-    # Check if Cognito is configured
-    logger.info(f"COGNITO_DOMAIN: {current_app.config.get('COGNITO_DOMAIN')}")
-    logger.info(f"COGNITO_CLIENT_ID: {current_app.config.get('COGNITO_CLIENT_ID')}")
-    logger.info(f"COGNITO_APP_CLIENT_ID: {current_app.config.get('COGNITO_APP_CLIENT_ID')}")
-    logger.info(f"DISABLE_AUTH: {current_app.config.get('DISABLE_AUTH')}")
+    cognito_domain = current_app.config.get('COGNITO_DOMAIN')
+    client_id = _cognito_client_id()
     
-    # Try to get client ID from either COGNITO_CLIENT_ID or COGNITO_APP_CLIENT_ID
-    client_id = current_app.config.get('COGNITO_CLIENT_ID') or current_app.config.get('COGNITO_APP_CLIENT_ID')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("COGNITO_DOMAIN: %s", cognito_domain)
+        logger.debug("COGNITO_CLIENT_ID: %s", client_id)
+        logger.debug("DISABLE_AUTH: %s", current_app.config.get('DISABLE_AUTH'))
     
-    if not current_app.config.get('COGNITO_DOMAIN') or not client_id:
+    # Check if Cognito is configured
+    if not cognito_domain or not client_id:
         logger.warning("Cognito is not configured properly")
         return url_for('auth.login')
     
-    # Build the Cognito login URL
-    cognito_domain = current_app.config['COGNITO_DOMAIN']
+    # Fill the cached template with the URL encoded redirect URI
+    login_url = _cognito_url_templates(cognito_domain, client_id)[0].format(redirect_uri=quote(redirect_uri))
     
-    # Ensure the domain has the correct format
-    if not cognito_domain.startswith('http'):
-        cognito_domain = f"https://{cognito_domain}"
-    
-    # URL encode the redirect URI
-    import urllib.parse
-    encoded_redirect_uri = urllib.parse.quote(redirect_uri)
-    
-    # Build the login URL
-    login_url = (
-        f"{cognito_domain}/login?"
-        f"client_id={client_id}&"
-        f"response_type=code&"
-        f"scope=email+openid+profile&"
-        f"redirect_uri={encoded_redirect_uri}"
-    )
-    
-    logger.info(f"Generated Cognito login URL: {login_url}")
+    logger.debug("Generated Cognito login URL: %s", login_url)
     return login_url
 
 def get_cognito_logout_url(redirect_uri):
@@ -148,27 +188,15 @@ def get_cognito_logout_url(redirect_uri):
     Returns:
         str: Cognito logout URL
     """
-    # Try to get client ID from either COGNITO_CLIENT_ID or COGNITO_APP_CLIENT_ID
-    client_id = current_app.config.get('COGNITO_CLIENT_ID') or current_app.config.get('COGNITO_APP_CLIENT_ID')
+    cognito_domain = current_app.config.get('COGNITO_DOMAIN')
+    client_id = _cognito_client_id()
     
     # Check if Cognito is configured
-    if not current_app.config.get('COGNITO_DOMAIN') or not client_id:
+    if not cognito_domain or not client_id:
         logger.warning("Cognito is not configured properly")
         return url_for('main.index')
     
-    # Build the Cognito logout URL
-    cognito_domain = current_app.config['COGNITO_DOMAIN']
-    
-    # Ensure the domain has the correct format
-    if not cognito_domain.startswith('http'):
-        cognito_domain = f"https://{cognito_domain}"
-    
-    # Build the logout URL
-    logout_url = (
-        f"{cognito_domain}/logout?"
-        f"client_id={client_id}&"
-        f"redirect_uri={redirect_uri}"
-    )
+    logout_url = _cognito_url_templates(cognito_domain, client_id)[1].format(redirect_uri=redirect_uri)
     
-    logger.info(f"Generated Cognito logout URL: {logout_url}")
+    logger.debug("Generated Cognito logout URL: %s", logout_url)
     return logout_url
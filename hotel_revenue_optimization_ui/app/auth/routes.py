@@ -1,20 +1,20 @@
 from flask import render_template, redirect, url_for, request, session, current_app, jsonify
 from app.auth import bp
-from app.auth.cognito import get_cognito_login_url, get_cognito_logout_url
+from app.auth.cognito import get_cognito_login_url, get_cognito_logout_url, clear_auth_session, _decode_jwt_payload
 import logging
 import time
+import requests
+from requests.adapters import HTTPAdapter
 
-# Configure logging
+# Configure logging (handlers and level are set once by app.logging_config)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-# Create console handler if it doesn't exist
-if not logger.handlers:
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+# Shared HTTP session so token exchanges reuse TCP/TLS connections to the Cognito domain
+_http = requests.Session()
+_http.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
+
+# (connect, read) timeouts for the Cognito token endpoint
+TOKEN_REQUEST_TIMEOUT = (5, 15)
 
 @bp.route('/login')
 def login():
@@ -40,15 +40,15 @@ def login():
     if current_app.config.get('AUTH_REDIRECT_URI'):
         # Use the configured redirect URI
         redirect_uri = current_app.config.get('AUTH_REDIRECT_URI')
-        logger.info(f"Using configured redirect URI: {redirect_uri}")
+        logger.info("Using configured redirect URI: %s", redirect_uri)
     elif current_app.config.get('CLOUDFRONT_DOMAIN'):
         # Use CloudFront domain for production
         redirect_uri = f"https://{current_app.config['CLOUDFRONT_DOMAIN']}/auth/callback"
-        logger.info(f"Using CloudFront redirect URI: {redirect_uri}")
+        logger.info("Using CloudFront redirect URI: %s", redirect_uri)
     else:
         # Use local domain for development
         redirect_uri = url_for('auth.callback', _external=True)
-        logger.info(f"Using local redirect URI: {redirect_uri}")
+        logger.info("Using local redirect URI: %s", redirect_uri)
     
     # Get the Cognito login URL
     login_url = get_cognito_login_url(redirect_uri)
@@ -63,13 +63,12 @@ def callback():
     if code:
         logger.info("Received authorization code from Cognito")
         # Log all request parameters for debugging
-        logger.info(f"Request args: {request.args}")
+        logger.info("Request args: %s", request.args)
         
         try:
             # Exchange the code for tokens
             token_endpoint = f"https://{current_app.config['COGNITO_DOMAIN']}/oauth2/token"
             client_id = current_app.config.get('COGNITO_CLIENT_ID') or current_app.config.get('COGNITO_APP_CLIENT_ID')
-            client_secret = current_app.config.get('COGNITO_CLIENT_SECRET', '5lvq8u7vsulcnp6l5pfquitf3ta9gkc74ghu9414972cgjnijq3')
             
             if current_app.config.get('AUTH_REDIRECT_URI'):
                 redirect_uri = current_app.config.get('AUTH_REDIRECT_URI')
@@ -78,21 +77,11 @@ def callback():
             else:
                 redirect_uri = url_for('auth.callback', _external=True)
             
-            logger.info(f"Token endpoint: {token_endpoint}")
-            logger.info(f"Client ID: {client_id}")
-            logger.info(f"Redirect URI: {redirect_uri}")
-            
-            import requests
-            import base64
-            
-            # Create the Authorization header with Basic auth using client_id and client_secret
-            auth_header = base64.b64encode(f"{client_id}:{client_secret}".encode('utf-8')).decode('utf-8')
+            logger.info("Token endpoint: %s", token_endpoint)
+            logger.info("Client ID: %s", client_id)
+            logger.info("Redirect URI: %s", redirect_uri)
             
-            # Debug logging
-            logger.info(f"Client Secret (first 10 chars): {client_secret[:10]}...")
-            logger.info(f"Auth header: Basic {auth_header}")
-            
-            token_response = requests.post(
+            token_response = _http.post(
                 token_endpoint,
                 data={
                     'grant_type': 'authorization_code',
@@ -101,8 +90,10 @@ def callback():
                 },
                 headers={
                     'Content-Type': 'application/x-www-form-urlencoded',
-                    'Authorization': f'Basic {auth_header}'
-                }
+                    # Basic auth from client_id and client_secret, built once in create_app
+                    'Authorization': current_app.config['_COGNITO_BASIC_AUTH']
+                },
+                timeout=TOKEN_REQUEST_TIMEOUT
             )
             
             if token_response.status_code == 200:
@@ -110,24 +101,14 @@ def callback():
                 id_token = tokens.get('id_token')
                 access_token = tokens.get('access_token')
                 
-                # Get user info from the ID token
-                import jwt
-                import base64
-                import json
-                
                 # Parse the ID token payload
-                id_token_parts = id_token.split('.')
-                if len(id_token_parts) >= 2:
-                    # Fix padding for base64 decoding
-                    payload = id_token_parts[1]
-                    payload += '=' * (4 - len(payload) % 4) if len(payload) % 4 != 0 else ''
-                    
+                if len(id_token.split('.')) >= 2:
                     try:
-                        decoded_payload = base64.b64decode(payload)
-                        user_info = json.loads(decoded_payload)
+                        # Decoded claims are cached per token
+                        user_info = _decode_jwt_payload(id_token)
                         
                         # Log user info for debugging (excluding sensitive data)
-                        logger.info(f"User info from token: email={user_info.get('email')}, name={user_info.get('name')}, given_name={user_info.get('given_name')}, family_name={user_info.get('family_name')}")
+                        logger.info("User info from token: email=%s, name=%s, given_name=%s, family_name=%s", user_info.get('email'), user_info.get('name'), user_info.get('given_name'), user_info.get('family_name'))
                         
                         # Store user info in session
                         session.permanent = True
@@ -149,11 +130,11 @@ def callback():
                         else:
                             session['token_expiration'] = int(time.time()) + (24 * 60 * 60)
                         
-                        logger.info(f"User added to session: {session['user'].get('email')}")
-                        logger.info(f"Token expiration: {session.get('token_expiration')}")
+                        logger.info("User added to session: %s", session['user'].get('email'))
+                        logger.info("Token expiration: %s", session.get('token_expiration'))
                         
                     except Exception as e:
-                        logger.error(f"Error decoding ID token: {e}")
+                        logger.error("Error decoding ID token: %s", e)
                         # Return error instead of using hardcoded values
                         return render_template('auth/error.html', 
                                               error="Authentication Error", 
@@ -165,14 +146,14 @@ def callback():
                                           error="Authentication Error", 
                                           error_description="Invalid token format received. Please try again or contact support.")
             else:
-                logger.error(f"Error exchanging code for tokens: {token_response.status_code} {token_response.text}")
+                logger.error("Error exchanging code for tokens: %s %s", token_response.status_code, token_response.text)
                 # Return error instead of using hardcoded values
                 return render_template('auth/error.html', 
                                       error="Authentication Error", 
                                       error_description=f"Failed to authenticate with Cognito. Error: {token_response.text}")
                 
         except Exception as e:
-            logger.error(f"Error in token exchange: {e}")
+            logger.error("Error in token exchange: %s", e)
             # Return error instead of using hardcoded values
             return render_template('auth/error.html', 
                                   error="Authentication Error", 
@@ -185,8 +166,8 @@ def callback():
     # If there's an error parameter, log it
     error = request.args.get('error')
     if error:
-        logger.error(f"Error in Cognito callback: {error}")
-        logger.error(f"Error description: {request.args.get('error_description')}")
+        logger.error("Error in Cognito callback: %s", error)
+        logger.error("Error description: %s", request.args.get('error_description'))
         return render_template('auth/error.html', error=error, error_description=request.args.get('error_description'))
     
     # This endpoint is used for the implicit grant flow
@@ -221,8 +202,8 @@ def process_token():
         'name': data.get('name', data.get('email', 'User'))
     }
     
-    logger.info(f"Token processed and user added to session: {session.get('user', {}).get('email')}")
-    logger.info(f"Session expiration: {session.get('token_expiration')}")
+    logger.info("Token processed and user added to session: %s", session.get('user', {}).get('email'))
+    logger.info("Session expiration: %s", session.get('token_expiration'))
     
     return jsonify({'success': True, 'redirect': url_for('main.index')})
 
@@ -230,10 +211,7 @@ def process_token():
 def logout():
     """Logout endpoint"""
     # Clear the session
-    session.pop('user', None)
-    session.pop('id_token', None)
-    session.pop('access_token', None)
-    session.pop('token_expiration', None)
+    clear_auth_session()
     
     # Check if authentication is disabled for local development
     if current_app.config.get('DISABLE_AUTH', False):
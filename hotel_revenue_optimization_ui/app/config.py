@@ -20,6 +20,9 @@ class Config:
     AWS_CONNECT_TIMEOUT = int(os.environ.get('AWS_CONNECT_TIMEOUT', '10'))  # 10 seconds
     AWS_READ_TIMEOUT = int(os.environ.get('AWS_READ_TIMEOUT', '120'))  # 2 minutes
     
+    # Connection pool size for the shared AgentCore client
+    AWS_MAX_POOL = int(os.environ.get('AWS_MAX_POOL', '50'))
+    
     # Cognito Configuration
     COGNITO_REGION = os.environ.get('COGNITO_REGION', AWS_REGION)
     COGNITO_USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID', '')
@@ -54,6 +57,14 @@ class Config:
         'font-src': ["'self'", 'cdn.jsdelivr.net'],
         'connect-src': ["'self'"]
     }
+    # Header form of the policy, built once for whatever sends the header
+    CONTENT_SECURITY_POLICY_HEADER = '; '.join(
+        f"{directive} {' '.join(sources)}" for directive, sources in CONTENT_SECURITY_POLICY.items()
+    )
+    
+    @classmethod
+    def validate(cls):
+        """Check required settings. Called once by the app factory."""
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -81,17 +92,19 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     
-    # Ensure these are set in production
-    def __init__(self):
-        assert os.environ.get('SECRET_KEY', 'dev-key-please-change-in-production') != 'dev-key-please-change-in-production', \
-            'SECRET_KEY must be set in production'
-        assert os.environ.get('COGNITO_USER_POOL_ID'), 'COGNITO_USER_POOL_ID must be set in production'
-        assert os.environ.get('COGNITO_APP_CLIENT_ID'), 'COGNITO_APP_CLIENT_ID must be set in production'
-    
     # Disable authentication only if explicitly set
     DISABLE_AUTH = os.environ.get('DISABLE_AUTH', 'False').lower() == 'true'
+    
+    # Ensure these are set in production
+    @classmethod
+    def validate(cls):
+        """Check required settings. Called once by the app factory."""
+        assert cls.SECRET_KEY != 'dev-key-please-change-in-production', 'SECRET_KEY must be set in production'
+        assert cls.COGNITO_USER_POOL_ID, 'COGNITO_USER_POOL_ID must be set in production'
+        assert cls.COGNITO_APP_CLIENT_ID, 'COGNITO_APP_CLIENT_ID must be set in production'
 
-# Configuration dictionary
+# Configuration dictionary. The classes are evaluated once at import and passed to
+# app.config.from_object as-is, so no instance is ever created.
 config = {
     'development': DevelopmentConfig,
     'testing': TestingConfig,
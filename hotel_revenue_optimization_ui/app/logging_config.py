@@ -0,0 +1,36 @@
+"""
+Logging configuration for the Hotel Revenue Optimization UI.
+"""
+import os
+import logging
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_configured = False
+
+def configure_logging(level=None):
+    """
+    Configure application logging once per process.
+    
+    A single console handler is attached to the root logger (unless one is already
+    configured, e.g. by app.py or gunicorn), and the level is set on the `app` package
+    logger so every module logger inherits it.
+    
+    Args:
+        level: Log level for the application loggers (defaults to the LOG_LEVEL
+            environment variable, or INFO)
+    """
+    global _configured
+    if _configured:
+        return
+    
+    root_logger = logging.getLogger()
+    if not root_logger.handlers:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root_logger.addHandler(console_handler)
+    
+    if level is None:
+        level = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    logging.getLogger('app').setLevel(level)
+    _configured = True
@@ -1,32 +1,111 @@
-from flask import render_template, redirect, url_for, flash, request, current_app, session, jsonify, Response
+from flask import render_template, redirect, url_for, flash, request, current_app, session, jsonify, Response, stream_with_context, stream_template, get_flashed_messages
+from flask_wtf.csrf import generate_csrf
 from app.main import bp
 from app.main.forms import NaturalLanguageForm, StructuredForm
-from app.api.agentcore import invoke_agentcore
+from app.api.agentcore import invoke_agentcore, invoke_agentcore_stream
 from app.auth.cognito import token_required
 from app.services.history import QueryHistoryService
 from app.services.email_report import EmailReportService
 from app.services.async_processor import async_processor
-import markdown
+from app.services.markdown_renderer import render_markdown, iter_markdown_sections
+import html
+import hashlib
 import json
 import logging
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 
-# Configure logging
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Configure logging (handlers and level are set once by app.logging_config)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
 # Initialize services
 history_service = QueryHistoryService()
 email_service = EmailReportService()
 
-# Create console handler if it doesn't exist
-if not logger.handlers:
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+# Bound once; submit handlers use it for the history sort key and async correlation id
+_utcnow = datetime.utcnow
+
+# How long a failed query keeps reporting as processing after submission
+_FAILED_GRACE_PERIOD = timedelta(minutes=5)
+
+# Structured form fields that aren't part of the AgentCore payload
+_NON_PAYLOAD_FIELDS = frozenset(('submit', 'csrf_token'))
+
+# Decoder bound once for parsing JSON error payloads
+_json_decode = json.JSONDecoder().decode
+
+# Page shown when a submission fails. The HTML is rendered once with a placeholder for
+# the error text, so the error path only substitutes the escaped message.
+_ERROR_MARKDOWN = """
+# Error Processing {subject}
+
+We encountered an issue while processing your {description}. This could be due to:
+
+- Service availability
+- Network connectivity issues
+- Authentication or permission issues
+
+## Error Details
+
+```
+{error}
+```
+
+Please try again in a few minutes. If the issue persists, contact your system administrator.
+"""
+_ERROR_PLACEHOLDER = '__ERROR_DETAILS__'
+_QUERY_ERROR_MARKDOWN = _ERROR_MARKDOWN.format(subject='Query', description='query', error='{error}')
+_FORM_ERROR_MARKDOWN = _ERROR_MARKDOWN.format(subject='Form', description='form submission', error='{error}')
+_QUERY_ERROR_HTML = render_markdown(_QUERY_ERROR_MARKDOWN.format(error=_ERROR_PLACEHOLDER))
+_FORM_ERROR_HTML = render_markdown(_FORM_ERROR_MARKDOWN.format(error=_ERROR_PLACEHOLDER))
+
+# Sample queries for the user to try - sequenced for optimal demo flow
+_SAMPLE_QUERIES = (
+    # Start with detailed business hotel analysis with seasonal events
+    "Forecast demand for Metropolitan Business Hotel in Chicago, IL 60601 with current 65% occupancy and $220 ADR. Plan for next 3 months considering McCormick Place convention schedule, Chicago Marathon in October, and holiday business travel patterns. Target 75% occupancy by December.",
+    
+    # Comprehensive luxury resort with specific location and competitive landscape
+    "Optimize revenue for The Grand Oceanview Resort in Miami Beach, FL 33139. 5-star luxury oceanfront property with 200 suites, premium ocean-view rooms, and standard accommodations. Current metrics: 78% occupancy, $485 ADR, $378 RevPAR. Target $420 RevPAR for Q1 2025. Competing with Fontainebleau, St. Regis, and new luxury developments. Address Art Basel Miami Beach impact and winter season pricing.",
+    
+    # Seasonal ski resort with summer/winter strategy
+    "Create year-round revenue strategy for Sunset Mountain Resort in Aspen, CO 81611. 4.5-star ski resort with 150 rooms: standard mountain rooms, deluxe slope-view suites, and luxury chalets. Winter season: 85% occupancy, $650 ADR. Summer challenge: 45% occupancy, $280 ADR. Plan for Aspen Music Festival, hiking season, and shoulder periods. Target consistent $400 RevPAR year-round.",
+    
+    # Tech hub boutique with event-driven demand
+    "Analyze competitor pricing for Artisan Loft boutique hotel in San Francisco, CA 94103 (SOMA district). 4-star property with 80 loft-style rooms and creative suites, currently $295 ADR, 72% occupancy. Prepare pricing strategy for Dreamforce conference, Oracle OpenWorld, and tech IPO season. Competing with Hotel Zephyr, The Phoenix, and Airbnb market.",
+    
+    # Budget hotel with OTA optimization focus
+    "Increase RevPAR for Budget Stay Inn in Austin, TX 78701 (downtown). 3-star property with 120 standard and family rooms. Current: 82% occupancy, $95 ADR, $78 RevPAR. Target $90 RevPAR within 6 months. Address SXSW pricing, UT football season demand, and reduce 35% OTA commission dependency. Competing with Hampton Inn, Holiday Inn Express."
+)
+
+def _json_response(payload):
+    """jsonify() for the small responses polled by the browser, serialized with orjson when available"""
+    if orjson is None:
+        return jsonify(payload)
+    return current_app.response_class(orjson.dumps(payload), mimetype='application/json')
+
+def _status_response(payload):
+    """
+    Status poll response with a weak ETag over the payload
+    
+    Pollers revalidate with If-None-Match and get an empty 304 until the status or
+    summary changes, so unchanged polls skip serialization and the response body.
+    """
+    etag = hashlib.blake2b(
+        f"{payload['status']}|{payload['summary']}|{payload['timestamp']}".encode('utf-8'),
+        digest_size=8
+    ).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = _json_response(payload)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @bp.route('/')
 def index():
@@ -48,60 +127,33 @@ def natural_language():
     result = None
     markdown_content = None
     
-    # Sample queries for the user to try - sequenced for optimal demo flow
-    sample_queries = [
-        # Start with detailed business hotel analysis with seasonal events
-        "Forecast demand for Metropolitan Business Hotel in Chicago, IL 60601 with current 65% occupancy and $220 ADR. Plan for next 3 months considering McCormick Place convention schedule, Chicago Marathon in October, and holiday business travel patterns. Target 75% occupancy by December.",
-        
-        # Comprehensive luxury resort with specific location and competitive landscape
-        "Optimize revenue for The Grand Oceanview Resort in Miami Beach, FL 33139. 5-star luxury oceanfront property with 200 suites, premium ocean-view rooms, and standard accommodations. Current metrics: 78% occupancy, $485 ADR, $378 RevPAR. Target $420 RevPAR for Q1 2025. Competing with Fontainebleau, St. Regis, and new luxury developments. Address Art Basel Miami Beach impact and winter season pricing.",
-        
-        # Seasonal ski resort with summer/winter strategy
-        "Create year-round revenue strategy for Sunset Mountain Resort in Aspen, CO 81611. 4.5-star ski resort with 150 rooms: standard mountain rooms, deluxe slope-view suites, and luxury chalets. Winter season: 85% occupancy, $650 ADR. Summer challenge: 45% occupancy, $280 ADR. Plan for Aspen Music Festival, hiking season, and shoulder periods. Target consistent $400 RevPAR year-round.",
-        
-        # Tech hub boutique with event-driven demand
-        "Analyze competitor pricing for Artisan Loft boutique hotel in San Francisco, CA 94103 (SOMA district). 4-star property with 80 loft-style rooms and creative suites, currently $295 ADR, 72% occupancy. Prepare pricing strategy for Dreamforce conference, Oracle OpenWorld, and tech IPO season. Competing with Hotel Zephyr, The Phoenix, and Airbnb market.",
-        
-        # Budget hotel with OTA optimization focus
-        "Increase RevPAR for Budget Stay Inn in Austin, TX 78701 (downtown). 3-star property with 120 standard and family rooms. Current: 82% occupancy, $95 ADR, $78 RevPAR. Target $90 RevPAR within 6 months. Address SXSW pricing, UT football season demand, and reduce 35% OTA commission dependency. Competing with Hampton Inn, Holiday Inn Express."
-    ]
-    
     # Pre-fill the form if query is provided in URL parameters
     if request.args.get('query') and not form.query.data:
         query = request.args.get('query')
-        logger.info(f"Pre-filling form with query from URL: {query}")
+        logger.info("Pre-filling form with query from URL: %s", query)
         form.query.data = query
     
     if form.validate_on_submit():
         try:
             query = form.query.data
-            logger.info(f"Processing natural language query: {query}")
+            logger.info("Processing natural language query: %s", query)
             
             user_id = session.get('user', {}).get('sub')
-            timestamp = datetime.utcnow().isoformat()
+            timestamp = _utcnow().isoformat()
             
-            # Save pending query immediately
             query_data = {
                 'query_type': 'natural_language',
                 'query': query
             }
             
-            history_service.save_query_result(
+            # Save the pending query and start processing off the request thread
+            async_processor.enqueue_with_pending(
                 user_id=user_id,
                 timestamp=timestamp,
+                query_data=query_data,
                 query_type='natural_language',
                 query_summary=query,
-                result_data={},
-                result_status='processing',
-                result_summary='Processing your query...'
-            )
-            
-            # Start async processing
-            async_processor.process_query_async(
-                user_id=user_id,
-                timestamp=timestamp,
-                query_data=query_data,
-                query_type='natural_language'
+                pending_summary='Processing your query...'
             )
             
             # Return JSON response with timestamp for polling
@@ -112,42 +164,23 @@ def natural_language():
             })
         
         except Exception as e:
-            logger.error(f"Error processing query: {str(e)}", exc_info=True)
+            logger.error("Error processing query: %s", e, exc_info=True)
             flash(f'Error processing query: {str(e)}', 'danger')
             result = {
                 "summary": "Error processing query",
-                "markdown_content": f"""
-# Error Processing Query
-
-We encountered an issue while processing your query. This could be due to:
-
-- Service availability
-- Network connectivity issues
-- Authentication or permission issues
-
-## Error Details
-
-```
-{str(e)}
-```
-
-Please try again in a few minutes. If the issue persists, contact your system administrator.
-""",
+                "markdown_content": _QUERY_ERROR_MARKDOWN.format(error=str(e)),
                 "status": "error",
                 "completed_tasks": [],
                 "failed_tasks": ["response_processing"]
             }
-            markdown_content = markdown.markdown(
-                result['markdown_content'],
-                extensions=['tables', 'fenced_code']
-            )
+            markdown_content = _QUERY_ERROR_HTML.replace(_ERROR_PLACEHOLDER, html.escape(str(e), quote=False))
     
     return render_template(
         'natural_language.html',
         form=form,
         result=result,
         markdown_content=markdown_content,
-        sample_queries=sample_queries
+        sample_queries=_SAMPLE_QUERIES
     )
 
 @bp.route('/structured_form', methods=['GET', 'POST'])
@@ -162,40 +195,22 @@ def structured_form():
     if form.validate_on_submit():
         try:
             # Build the payload from form data
-            payload = {
-                "query_type": "structured",
-                "hotel_name": form.hotel_name.data,
-                "hotel_type": form.hotel_type.data,
-                "location": form.location.data,
-                "season": form.season.data,
-                "star_rating": form.star_rating.data,
-                "occupancy_rate": form.occupancy_rate.data,
-                "competitor_analysis": form.competitor_analysis.data,
-                "optimization_goal": form.optimization_goal.data
-            }
+            payload = {"query_type": "structured"}
+            payload.update((field.name, field.data) for field in form if field.name not in _NON_PAYLOAD_FIELDS)
             
-            logger.info(f"Processing structured form: hotel_name={payload['hotel_name']}, hotel_type={payload['hotel_type']}")
+            logger.info("Processing structured form: hotel_name=%s, hotel_type=%s", payload['hotel_name'], payload['hotel_type'])
             
             user_id = session.get('user', {}).get('sub')
-            timestamp = datetime.utcnow().isoformat()
+            timestamp = _utcnow().isoformat()
             
-            # Save pending query immediately
-            history_service.save_query_result(
+            # Save the pending query and start processing off the request thread
+            async_processor.enqueue_with_pending(
                 user_id=user_id,
                 timestamp=timestamp,
+                query_data=payload,
                 query_type='structured_form',
                 query_summary=f"{payload['hotel_name']} - {payload['optimization_goal']}",
-                result_data={},
-                result_status='processing',
-                result_summary='Processing your analysis...'
-            )
-            
-            # Start async processing
-            async_processor.process_query_async(
-                user_id=user_id,
-                timestamp=timestamp,
-                query_data=payload,
-                query_type='structured_form'
+                pending_summary='Processing your analysis...'
             )
             
             flash('Your analysis has been submitted and is being processed. Check your history for results.', 'success')
@@ -206,97 +221,16 @@ def structured_form():
             })
         
         except Exception as e:
-            response_content = response.get('markdown_content') or response.get('report', '')
-            if response_content and response_content.strip().startswith('{'):
-                try:
-                    # Try to parse the content as JSON (it might be an error response)
-                    import json
-                    logger.info(f"Structured Form - Attempting to parse response content as JSON: {response_content[:200]}...")
-                    error_data = json.loads(response_content)
-                    if error_data.get('status') == 'error':
-                        logger.info("Structured Form - Detected JSON error response")
-                        logger.info(f"Structured Form - Error data: {error_data}")
-                        # Update the result with parsed error data
-                        result.update(error_data)
-                        # Clear the content fields since they're now parsed
-                        result['markdown_content'] = None
-                        result['report'] = None
-                        logger.info(f"Structured Form - Updated result: {result}")
-                except (json.JSONDecodeError, ValueError) as e:
-                    # If it's not valid JSON, treat it as regular content
-                    logger.info(f"Structured Form - Failed to parse as JSON: {e}")
-                    pass
-            
-            # Check if there was an error
-            if "error" in response or result.get('status') == 'error':
-                error_msg = response.get('error') or result.get('message', 'Unknown error occurred')
-                logger.error(f"Error in AgentCore response: {error_msg}")
-                flash(f"Error: {error_msg}", 'danger')
-            else:
-                # Handle the new response schema with 'report' field
-                if 'report' in response and response['report'] and not result.get('status') == 'error':
-                    logger.info("Converting report content to HTML")
-                    markdown_content = markdown.markdown(
-                        response['report'],
-                        extensions=['tables', 'fenced_code']
-                    )
-                elif 'markdown_content' in response and response['markdown_content'] and not result.get('status') == 'error':
-                    logger.info("Converting markdown_content to HTML")
-                    markdown_content = markdown.markdown(
-                        response['markdown_content'],
-                        extensions=['tables', 'fenced_code']
-                    )
-                    logger.info("Converting markdown content to HTML")
-                    markdown_content = markdown.markdown(
-                        response['markdown_content'],
-                        extensions=['tables', 'fenced_code']
-                    )
-                
-                # Save to session for history
-                if 'query_history' not in session:
-                    session['query_history'] = []
-                
-                logger.info("Adding query to history")
-                session['query_history'].append({
-                    'query': f"Hotel: {payload['hotel_name']}, Type: {payload['hotel_type']}, Location: {payload['location']}, Season: {payload['season']}",
-                    'timestamp': datetime.now().isoformat(),
-                    'result_summary': response.get('summary', 'No summary available'),
-                    'status': response.get('status', 'unknown')
-                })
-                session.modified = True
-                
-                flash('Form processed successfully', 'success')
-        
-        except Exception as e:
-            logger.error(f"Error processing form: {str(e)}", exc_info=True)
+            logger.error("Error processing form: %s", e, exc_info=True)
             flash(f'Error processing form: {str(e)}', 'danger')
             result = {
                 "summary": "Error processing form",
-                "markdown_content": f"""
-# Error Processing Form
-
-We encountered an issue while processing your form submission. This could be due to:
-
-- Service availability
-- Network connectivity issues
-- Authentication or permission issues
-
-## Error Details
-
-```
-{str(e)}
-```
-
-Please try again in a few minutes. If the issue persists, contact your system administrator.
-""",
+                "markdown_content": _FORM_ERROR_MARKDOWN.format(error=str(e)),
                 "status": "error",
                 "completed_tasks": [],
                 "failed_tasks": ["response_processing"]
             }
-            markdown_content = markdown.markdown(
-                result['markdown_content'],
-                extensions=['tables', 'fenced_code']
-            )
+            markdown_content = _FORM_ERROR_HTML.replace(_ERROR_PLACEHOLDER, html.escape(str(e), quote=False))
     
     return render_template(
         'structured_form.html',
@@ -305,6 +239,37 @@ Please try again in a few minutes. If the issue persists, contact your system ad
         markdown_content=markdown_content
     )
 
+@bp.route('/stream-query', methods=['POST'])
+@token_required
+def stream_query():
+    """Stream the AgentCore response for a natural language query as server-sent events"""
+    data = request.get_json(silent=True) or {}
+    query = data.get('query')
+    
+    if not query:
+        return jsonify({'status': 'error', 'message': 'No query provided'}), 400
+    
+    logger.info("Streaming natural language query: %s", query)
+    payload = {
+        'query_type': 'natural_language',
+        'query': query
+    }
+    
+    def generate():
+        try:
+            for chunk in invoke_agentcore_stream(payload):
+                # Multi-line chunks need one data field per line to stay a single event
+                yield ''.join(f"data: {line}\n" for line in chunk.split('\n')) + '\n'
+        except Exception as e:
+            logger.error("Error streaming query: %s", e, exc_info=True)
+            yield f"event: error\ndata: {str(e)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @bp.route('/history')
 @token_required
 def history():
@@ -314,13 +279,13 @@ def history():
     # Get history from DynamoDB if user is authenticated
     user_id = session.get('user', {}).get('sub')
     if user_id:
-        query_history = history_service.get_user_history(user_id)
+        query_history = history_service.get_user_history_cached(user_id)
     else:
         query_history = []
     
     return render_template('history.html', query_history=query_history)
 
-@bp.route('/history/<timestamp>')
+@bp.route('/history/<iso:timestamp>')
 @token_required
 def view_history_result(timestamp):
     """View a specific query result from history"""
@@ -330,36 +295,38 @@ def view_history_result(timestamp):
         return redirect(url_for('main.index'))
     
     # Get the specific query result
-    query_result = history_service.get_query_result(user_id, timestamp)
+    query_result = history_service.get_query_result_cached(user_id, timestamp)
     if not query_result:
         flash('Query result not found', 'error')
         return redirect(url_for('main.history'))
     
     # Process the result data for display
     result_data = query_result.get('result_data', {})
-    markdown_content = None
+    markdown_sections = None
     error_details = None
     
+    # Rendered lazily, section by section, while the page streams out
     if result_data.get('markdown_content'):
-        markdown_content = markdown.markdown(
-            result_data['markdown_content'],
-            extensions=['tables', 'fenced_code']
-        )
+        markdown_sections = iter_markdown_sections(result_data['markdown_content'])
     
     # Parse JSON error messages for better display
     if query_result.get('result_status') in ['failed', 'error'] and query_result.get('result_summary'):
         error_message = query_result.get('result_summary', '')
         if error_message.startswith('{') and error_message.endswith('}'):
             try:
-                import json
-                error_details = json.loads(error_message)
+                error_details = _json_decode(error_message)
             except:
                 pass
     
-    return render_template('history_result.html', 
+    # The session is saved before a streamed body renders, so pop flashed messages and
+    # create the CSRF token now (the template then reads both from the request context)
+    get_flashed_messages()
+    generate_csrf()
+    
+    return stream_template('history_result.html', 
                          query_result=query_result,
                          result=result_data,
-                         markdown_content=markdown_content,
+                         markdown_sections=markdown_sections,
                          error_details=error_details)
 
 @bp.route('/send-email-report', methods=['POST'])
@@ -369,12 +336,12 @@ def send_email_report():
     logger.info("Email report endpoint called")
     try:
         data = request.get_json()
-        logger.info(f"Request data: {data}")
+        logger.info("Request data: %s", data)
         
         recipient_email = data.get('email') if data else None
         timestamp = data.get('timestamp') if data else None
         
-        logger.info(f"Email: {recipient_email}, Timestamp: {timestamp}")
+        logger.info("Email: %s, Timestamp: %s", recipient_email, timestamp)
         
         if not recipient_email or not timestamp:
             logger.warning("Missing email or timestamp")
@@ -383,12 +350,12 @@ def send_email_report():
         user_id = session.get('user', {}).get('sub')
         user_email = session.get('user', {}).get('email', 'unknown@example.com')
         
-        logger.info(f"User ID: {user_id}, User Email: {user_email}")
+        logger.info("User ID: %s, User Email: %s", user_id, user_email)
         
         # Get query result
-        query_result = history_service.get_query_result(user_id, timestamp)
+        query_result = history_service.get_query_result_cached(user_id, timestamp)
         if not query_result:
-            logger.warning(f"Query result not found for user {user_id}, timestamp {timestamp}")
+            logger.warning("Query result not found for user %s, timestamp %s", user_id, timestamp)
             return jsonify({'success': False, 'message': 'Query result not found'}), 404
         
         # Send email
@@ -399,7 +366,7 @@ def send_email_report():
             query_summary=query_result.get('query_summary', 'Hotel Revenue Analysis')
         )
         
-        logger.info(f"Email send result: {success}")
+        logger.info("Email send result: %s", success)
         
         if success:
             return jsonify({'success': True, 'message': 'Report sent successfully'})
@@ -407,55 +374,53 @@ def send_email_report():
             return jsonify({'success': False, 'message': 'Failed to send report'}), 500
             
     except Exception as e:
-        logger.error(f"Error sending email report: {e}")
+        logger.error("Error sending email report: %s", e)
         return jsonify({'success': False, 'message': 'Internal server error'}), 500
 
-@bp.route('/check-query-status/<timestamp>')
+@bp.route('/check-query-status/<iso:timestamp>')
 @token_required
 def check_query_status(timestamp):
     """Check the status of a processing query"""
     try:
         user_id = session.get('user', {}).get('sub')
-        query_result = history_service.get_query_result(user_id, timestamp)
+        query_result = history_service.get_query_result_cached(user_id, timestamp)
         
         if not query_result:
-            return jsonify({'status': 'not_found'})
+            return _json_response({'status': 'not_found'})
         
         # If query is marked as failed but was submitted recently (within 5 minutes), 
         # keep showing as processing to give it more time
         if query_result.get('result_status') == 'failed':
-            from datetime import datetime, timedelta
+            # Parse timestamp (ISO format, as written by the submit handlers)
             try:
-                # Parse timestamp (format: YYYY-MM-DD HH:MM:SS)
-                query_time = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-                time_elapsed = datetime.now() - query_time
-                
-                # If less than 5 minutes have passed, show as processing
-                if time_elapsed < timedelta(minutes=5):
-                    # Use the original summary if it indicates processing
-                    original_summary = query_result.get('result_summary', '')
-                    if 'Processing' in original_summary or 'processing' in original_summary:
-                        summary = original_summary
-                    else:
-                        summary = 'Processing your request...'
-                        
-                    return jsonify({
-                        'status': 'processing',
-                        'summary': summary,
-                        'timestamp': timestamp
-                    })
-            except:
-                pass  # If timestamp parsing fails, use original status
+                query_time = datetime.fromisoformat(timestamp)
+            except ValueError:
+                query_time = None  # If timestamp parsing fails, use original status
+            
+            # Timestamps are naive UTC, so measure elapsed time against UTC as well
+            if query_time is not None and _utcnow() - query_time < _FAILED_GRACE_PERIOD:
+                # Use the original summary if it indicates processing
+                original_summary = query_result.get('result_summary', '')
+                if 'Processing' in original_summary or 'processing' in original_summary:
+                    summary = original_summary
+                else:
+                    summary = 'Processing your request...'
+                    
+                return _status_response({
+                    'status': 'processing',
+                    'summary': summary,
+                    'timestamp': timestamp
+                })
         
-        return jsonify({
+        return _status_response({
             'status': query_result.get('result_status', 'unknown'),
             'summary': query_result.get('result_summary', ''),
             'timestamp': query_result.get('timestamp', '')
         })
         
     except Exception as e:
-        logger.error(f"Error checking query status: {e}")
-        return jsonify({'status': 'error', 'message': str(e)})
+        logger.error("Error checking query status: %s", e)
+        return _json_response({'status': 'error', 'message': str(e)})
 
 @bp.route('/check-status', methods=['POST'])
 @token_required
@@ -469,12 +434,12 @@ def check_status():
     
     if not query_id:
         logger.warning("No query ID provided")
-        return jsonify({'status': 'error', 'message': 'No query ID provided'})
+        return _json_response({'status': 'error', 'message': 'No query ID provided'})
     
     # In a real application, you would check the status of the query in a database or queue
     # For this example, we'll just return a success status
-    logger.info(f"Query {query_id} is complete")
-    return jsonify({'status': 'complete'})
+    logger.info("Query %s is complete", query_id)
+    return _json_response({'status': 'complete'})
 
 @bp.route('/refresh-history', methods=['GET'])
 @token_required
@@ -482,8 +447,9 @@ def refresh_history():
     """Refresh the query history"""
     logger.info("Refreshing query history")
     
-    # Get the query history from the session
-    query_history = session.get('query_history', [])
+    # History lives in DynamoDB, not in the session cookie
+    user_id = session.get('user', {}).get('sub')
+    query_history = history_service.get_user_history_cached(user_id) if user_id else []
     
     # Return the query history as JSON
     return jsonify({'history': query_history})
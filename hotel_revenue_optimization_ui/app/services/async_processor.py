@@ -1,6 +1,8 @@
+import os
 import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from app.api.agentcore import invoke_agentcore
 from app.services.history import QueryHistoryService
@@ -9,32 +11,86 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on queries processed at once per worker process; further queries wait in the pool queue.
+# The AgentCore and DynamoDB calls are blocking boto3 calls, so threads (not an event loop) carry the
+# concurrency, and each query spends nearly all its time waiting on the network with the GIL released.
+ASYNC_WORKERS = int(os.environ.get('ASYNC_WORKERS', '16'))
+
+# Queries allowed to wait for a free worker; past this, submissions are refused instead of piling up
+ASYNC_QUEUE_SIZE = int(os.environ.get('ASYNC_QUEUE_SIZE', '1024'))
+
 class AsyncQueryProcessor:
-    def __init__(self):
-        pass
+    def __init__(self, max_workers=ASYNC_WORKERS, queue_size=ASYNC_QUEUE_SIZE):
+        # Reused worker threads instead of a new thread per query
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='agentcore-async')
+        # Cancel queued jobs at interpreter exit. This has to run before concurrent.futures joins
+        # its workers (which first runs every queued job), and that join is itself a threading
+        # exit hook that runs before atexit handlers; threading's exit hooks run newest first.
+        threading._register_atexit(self._cancel_pending)
+        # One slot per running or waiting query; the executor's own queue is unbounded
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+    
+    def _cancel_pending(self):
+        """Drop queued jobs on shutdown; only the queries already running are finished"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
     
     def process_query_async(self, user_id, timestamp, query_data, query_type):
-        """Process query asynchronously in background thread"""
+        """Process query asynchronously on the background worker pool"""
         # Get the current app context
         app = current_app._get_current_object()
         
-        thread = threading.Thread(
-            target=self._process_query_background,
-            args=(app, user_id, timestamp, query_data, query_type)
-        )
-        thread.daemon = True
-        thread.start()
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"Query backlog full, rejecting query {timestamp}")
+            raise RuntimeError("Too many queries are being processed, please try again shortly")
+        try:
+            future = self._executor.submit(
+                self._process_query_background,
+                app, user_id, timestamp, query_data, query_type
+            )
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
         logger.info(f"Started async processing for query {timestamp}")
     
+    def enqueue_with_pending(self, user_id, timestamp, query_data, query_type, query_summary, pending_summary):
+        """Queue the pending history record and process the query in the background"""
+        history_service = QueryHistoryService()
+        # Queued on the history write buffer without blocking, so status polls and the history
+        # page see the query while it waits for a worker; the buffer's FIFO order keeps the
+        # worker's final write after it
+        history_service.save_query_result(
+            user_id=user_id,
+            timestamp=timestamp,
+            query_type=query_type,
+            query_summary=query_summary,
+            result_data={},
+            result_status='processing',
+            result_summary=pending_summary
+        )
+        try:
+            self.process_query_async(user_id, timestamp, query_data, query_type)
+        except Exception as e:
+            # Not queued for processing, so don't leave the record pending
+            history_service.save_query_result(
+                user_id=user_id,
+                timestamp=timestamp,
+                query_type=query_type,
+                query_summary=query_summary,
+                result_data={'error': str(e)},
+                result_status='failed',
+                result_summary=f'Error: {str(e)}'
+            )
+            raise
+    
     def _process_query_background(self, app, user_id, timestamp, query_data, query_type):
         """Background processing of query with app context"""
         with app.app_context():
+            # One history service per job, shared by the success and error paths
+            history_service = QueryHistoryService()
             try:
                 logger.info(f"Processing query {timestamp} in background")
                 
-                # Initialize history service within app context
-                history_service = QueryHistoryService()
-                
                 # Generate session ID for this query
                 session_id = str(uuid.uuid4())
                 
@@ -42,15 +98,17 @@ class AsyncQueryProcessor:
                 result = invoke_agentcore(query_data, session_id=session_id)
                 
                 # Update history with result
+                query_summary = query_data.get('query', 'Query processed')
                 if result and result.get('status') == 'success':
+                    report = result.get('report') or ''
                     history_service.save_query_result(
                         user_id=user_id,
                         timestamp=timestamp,
                         query_type=query_type,
-                        query_summary=query_data.get('query', 'Query processed'),
+                        query_summary=query_summary,
                         result_data=result,
                         result_status='success',
-                        result_summary=result.get('report', '')[:200] + '...' if result.get('report') else 'Analysis completed'
+                        result_summary=(report[:200] + '...') if report else 'Analysis completed'
                     )
                     logger.info(f"Query {timestamp} completed successfully")
                 else:
@@ -58,7 +116,7 @@ class AsyncQueryProcessor:
                         user_id=user_id,
                         timestamp=timestamp,
                         query_type=query_type,
-                        query_summary=query_data.get('query', 'Query processed'),
+                        query_summary=query_summary,
                         result_data=result or {},
                         result_status='failed',
                         result_summary='Processing failed'
@@ -73,7 +131,6 @@ class AsyncQueryProcessor:
                     return
                 
                 # Only mark as failed for permanent errors
-                history_service = QueryHistoryService()
                 history_service.save_query_result(
                     user_id=user_id,
                     timestamp=timestamp,
@@ -81,7 +138,8 @@ class AsyncQueryProcessor:
                     query_summary=query_data.get('query', 'Query processed'),
                     result_data={'error': str(e)},
                     result_status='failed',
-                    result_summary=f'Error: {str(e)}'
+                    result_summary=f'Error: {str(e)}',
+                    sync=True
                 )
 
 # Global instance
@@ -1,63 +1,299 @@
 import boto3
 import json
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import logging
+import queue
+import atexit
+import functools
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from boto3.dynamodb.table import BatchWriter
+from botocore.config import Config as BotoConfig
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
-class QueryHistoryService:
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.table_name = os.environ.get('HISTORY_TABLE_NAME')
-        if self.table_name:
-            self.table = self.dynamodb.Table(self.table_name)
-        else:
-            self.table = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def _json_dumps(obj) -> str:
+    """Encode obj as a JSON string for a DynamoDB attribute, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+# orjson.loads raises a json.JSONDecodeError subclass, so the existing handlers still apply
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Short-lived cache of get_query_result lookups for the status polling endpoints.
+# Finished results no longer change, so they are kept much longer than in-flight ones.
+_RESULT_CACHE_MAXSIZE = 4096
+_RESULT_TTL_FINAL = 60.0
+_RESULT_TTL_PENDING = 0.5
+_FINAL_STATUSES = frozenset(('success', 'completed', 'failed', 'error'))
+_result_cache = {}
+_result_cache_lock = threading.Lock()
+
+# Invalidation count per key, so a lookup that overlapped a write doesn't cache what it read
+# before the write. Cleared (bumping the epoch) once it holds as many keys as the cache.
+_result_generations = {}
+_result_epoch = 0
+
+def _result_version(key):
+    """Snapshot of a key's invalidations; call with _result_cache_lock held"""
+    return _result_epoch, _result_generations.get(key, 0)
+
+def _invalidate_query_results(keys) -> None:
+    """Drop cached query results for the given (user_id, timestamp) keys"""
+    global _result_epoch
+    with _result_cache_lock:
+        if len(_result_generations) >= _RESULT_CACHE_MAXSIZE:
+            _result_generations.clear()
+            _result_epoch += 1
+        for key in keys:
+            _result_cache.pop(key, None)
+            _result_generations[key] = _result_generations.get(key, 0) + 1
+
+# Recent get_user_history results, per user and limit. A user's entries are dropped whenever
+# one of their items is written; the TTL bounds staleness from writes made by other processes.
+_HISTORY_CACHE_MAXSIZE = 1024
+_HISTORY_TTL = 15.0
+_history_cache = {}
+_history_cache_lock = threading.Lock()
+
+# Invalidation count per user, checked the same way as _result_generations
+_history_generations = {}
+_history_epoch = 0
+
+def _history_version(user_id):
+    """Snapshot of a user's history invalidations; call with _history_cache_lock held"""
+    return _history_epoch, _history_generations.get(user_id, 0)
+
+def _invalidate_user_history(user_ids) -> None:
+    """Drop cached history lists for the given users"""
+    global _history_epoch
+    with _history_cache_lock:
+        if len(_history_generations) >= _HISTORY_CACHE_MAXSIZE:
+            _history_generations.clear()
+            _history_epoch += 1
+        for user_id in user_ids:
+            _history_cache.pop(user_id, None)
+            _history_generations[user_id] = _history_generations.get(user_id, 0) + 1
+
+# Attributes the history listing shows ('timestamp' is a DynamoDB reserved word)
+_HISTORY_LIST_PROJECTION = '#ts, query_type, query_summary, result_status, result_summary'
+
+# Items expire from the history table 90 days after they are written
+_TTL_SECONDS = 90 * 86400
+
+# DynamoDB items are capped at 400 KB. Larger result payloads are stored in S3 with only a
+# pointer in the item when HISTORY_BUCKET is set, and have their report text cut otherwise.
+_MAX_INLINE_RESULT_BYTES = 300_000
+_TRUNCATED_REPORT_CHARS = 100_000
+_TRUNCATION_NOTE = '\n\n*Report truncated for storage.*'
+HISTORY_BUCKET = os.environ.get('HISTORY_BUCKET')
+
+@functools.lru_cache(maxsize=None)
+def _s3_client():
+    """S3 client for spilled result payloads, built once per process"""
+    return boto3.client('s3')
+
+# Sized for the async worker pool plus the web request threads that share the client.
+# Adaptive retries back off client-side when the table throttles batched writes.
+_DYNAMODB_CONFIG = BotoConfig(
+    max_pool_connections=int(os.environ.get('AWS_MAX_POOL', '50')),
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    tcp_keepalive=True
+)
+
+# Writes are coalesced for a short window and sent with BatchWriteItem (25 items at most per request)
+MAX_DYNAMO_BATCH_WRITE_ITEM_COUNT = 25
+_WRITE_COALESCE_WINDOW = 0.05
+_WRITE_ATTEMPTS = 3
+
+# Longest a synchronous write waits for the flusher: the batch attempts with their backoff and
+# the client's own throttling retries, plus the coalesce window
+_SYNC_WRITE_TIMEOUT = 30.0
+
+def _to_attribute_values(item: Dict) -> Dict:
+    """
+    Serialize a history item to DynamoDB AttributeValues for the low-level client
     
-    def save_query_result(self, user_id: str, timestamp: str, query_type: str, query_summary: str, result_data: Dict, result_status: str, result_summary: str) -> bool:
-        """Save query result to DynamoDB with specific parameters"""
-        if not self.table or not user_id:
-            return False
-        
+    History items are flat (strings plus the integer ttl), so this replaces the resource
+    layer's generic TypeSerializer walk. None values are written as NULL.
+    """
+    return {key: {'NULL': True} if value is None
+            else {'BOOL': value} if isinstance(value, bool)
+            else {'N': str(value)} if isinstance(value, int)
+            else {'S': value}
+            for key, value in item.items()}
+
+class _HistoryWriteBuffer:
+    """
+    Collects history items from any thread and writes them in batches from one flusher thread
+    
+    Every write goes through the same FIFO queue, so a later write of a key (e.g. a query's
+    final status) can never be overtaken by an earlier one still waiting to be flushed.
+    """
+    
+    def __init__(self, table_name: str, client):
+        self.table_name = table_name
+        self.client = client
+        # Entries are (item, future): the future, if any, is resolved once the item is written
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+    
+    def put(self, item: Dict) -> None:
+        self._pending.put((item, None))
+    
+    def put_and_wait(self, items: List[Dict]) -> bool:
+        """Queue items behind any pending writes and block until they have been written"""
+        futures = []
+        for item in items:
+            future = Future()
+            self._pending.put((item, future))
+            futures.append(future)
+        deadline = time.monotonic() + _SYNC_WRITE_TIMEOUT
         try:
-            item = {
-                'user_id': user_id,
-                'timestamp': timestamp,
-                'query_type': query_type,
-                'query_summary': query_summary,
-                'query_data': json.dumps({'query': query_summary}),
-                'result_status': result_status,
-                'result_summary': result_summary,
-                'result_data': json.dumps(result_data),
-                'ttl': int((datetime.utcnow() + timedelta(days=90)).timestamp())
-            }
-            
-            self.table.put_item(Item=item)
-            return True
-            
-        except Exception as e:
-            print(f"Error saving query result: {e}")
+            return all([future.result(timeout=max(0, deadline - time.monotonic())) for future in futures])
+        except FuturesTimeoutError:
+            logger.error("Timed out waiting for %d history writes", len(items))
             return False
-
-    def get_query_result(self, user_id: str, timestamp: str) -> Optional[Dict]:
-        """Get specific query result by user_id and timestamp"""
-        if not self.table or not user_id or not timestamp:
-            return None
+    
+    def flush(self) -> None:
+        """Write everything still queued (used at interpreter exit)"""
+        entries = []
+        while True:
+            try:
+                entries.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(entries), MAX_DYNAMO_BATCH_WRITE_ITEM_COUNT):
+            self._write_entries(entries[start:start + MAX_DYNAMO_BATCH_WRITE_ITEM_COUNT])
+    
+    def _run(self):
+        while True:
+            entries = [self._pending.get()]
+            deadline = time.monotonic() + _WRITE_COALESCE_WINDOW
+            while len(entries) < MAX_DYNAMO_BATCH_WRITE_ITEM_COUNT:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entries.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # The flusher must outlive any failure, or every later write would be stranded
+            try:
+                self._write_entries(entries)
+            except Exception:
+                logger.exception("Error flushing %d history entries", len(entries))
+                for _, future in entries:
+                    if future is not None and not future.done():
+                        future.set_result(False)
+    
+    def _write_entries(self, entries) -> None:
+        failed = self.write([item for item, _ in entries])
+        for item, future in entries:
+            if future is not None:
+                future.set_result((item['user_id'], item['timestamp']) not in failed)
+    
+    def write(self, items: List[Dict]) -> Set[Tuple[str, str]]:
+        """Write a batch, retrying with exponential backoff, and return the keys of items not written"""
+        failed = set()
+        for attempt in range(_WRITE_ATTEMPTS):
+            try:
+                # batch_writer resends UnprocessedItems; overwrite_by_pkeys keeps only the latest
+                # write per key, since a batch may not contain the same key twice
+                with BatchWriter(self.table_name, self.client,
+                                 overwrite_by_pkeys=['user_id', 'timestamp']) as batch:
+                    for item in items:
+                        batch.put_item(Item=_to_attribute_values(item))
+                break
+            except Exception:
+                if attempt == _WRITE_ATTEMPTS - 1:
+                    logger.exception("Error saving %d query results", len(items))
+                    failed = self._write_each(items)
+                    break
+                time.sleep(0.1 * 2 ** attempt)
         
-        try:
-            response = self.table.get_item(
-                Key={
-                    'user_id': user_id,
-                    'timestamp': timestamp
-                }
-            )
-            return response.get('Item')
-            
-        except Exception as e:
-            print(f"Error getting query result: {e}")
-            return None
+        # Polling endpoints and history pages re-read the rewritten items
+        _invalidate_query_results([(item['user_id'], item['timestamp']) for item in items])
+        _invalidate_user_history({item['user_id'] for item in items})
+        return failed
+    
+    def _write_each(self, items: List[Dict]) -> Set[Tuple[str, str]]:
+        """Fallback for a failed batch: write items one at a time so a bad item only loses itself"""
+        # Like the batch, only the latest write of each key is kept
+        latest = {(item['user_id'], item['timestamp']): item for item in items}
+        failed = set()
+        for key, item in latest.items():
+            try:
+                self.client.put_item(TableName=self.table_name, Item=_to_attribute_values(item))
+            except Exception:
+                logger.exception("Error saving query result %s", item['timestamp'])
+                failed.add(key)
+        return failed
+
+_write_buffers = {}
+_write_buffers_lock = threading.Lock()
+
+def _get_write_buffer(table_name: str, client) -> _HistoryWriteBuffer:
+    """One write buffer (and flusher thread) per table per process"""
+    with _write_buffers_lock:
+        buffer = _write_buffers.get(table_name)
+        if buffer is None:
+            buffer = _write_buffers[table_name] = _HistoryWriteBuffer(table_name, client)
+        return buffer
 
-    def save_query_result(self, user_id: str, timestamp: str, query_type: str, query_summary: str, result_data: Dict, result_status: str, result_summary: str) -> bool:
-        """Save query result to DynamoDB with specific parameters"""
+@functools.lru_cache(maxsize=None)
+def _history_table(table_name: str):
+    """
+    DynamoDB Table resource for the history table, built once per process
+    
+    Building a resource loads and parses the service model, so it isn't repeated for every
+    QueryHistoryService. The Table is only used for reads (get_item/query), which go
+    straight through its thread-safe client, so sharing it is fine.
+    """
+    return boto3.resource('dynamodb', config=_DYNAMODB_CONFIG).Table(table_name)
+
+@functools.lru_cache(maxsize=None)
+def _dynamodb_client():
+    """
+    Low-level DynamoDB client for history writes, built once per process
+    
+    Writes send items already serialized by _to_attribute_values. This must be a plain
+    client: a resource's meta.client has the resource serializer hooked in and would wrap
+    the AttributeValues a second time.
+    """
+    return boto3.client('dynamodb', config=_DYNAMODB_CONFIG)
+
+_RESULT_SUMMARIES = {
+    'success': "Revenue optimization recommendations",
+    'partial_success': "Partial revenue recommendations",
+    'error': "Query failed"
+}
+
+class QueryHistoryService:
+    def __init__(self):
+        self.table_name = os.environ.get('HISTORY_TABLE_NAME')
+        self.table = _history_table(self.table_name) if self.table_name else None
+        # Writes skip the resource layer and send pre-serialized items with a plain client
+        self.client = _dynamodb_client() if self.table_name else None
+    
+    def save_query_result(self, user_id: str, timestamp: str, query_type: str, query_summary: str, result_data: Dict, result_status: str, result_summary: str, sync: bool = False) -> bool:
+        """
+        Save query result to DynamoDB with specific parameters
+        
+        The write is queued and batched with other writes unless sync is set, in which
+        case it is written before returning.
+        """
         if not self.table or not user_id:
             return False
         
@@ -67,45 +303,31 @@ class QueryHistoryService:
                 'timestamp': timestamp,
                 'query_type': query_type,
                 'query_summary': query_summary,
-                'query_data': json.dumps({'query': query_summary}),
                 'result_status': result_status,
                 'result_summary': result_summary,
-                'result_data': json.dumps(result_data),
-                'ttl': int((datetime.utcnow() + timedelta(days=90)).timestamp())
+                'result_data': self._store_result_data(user_id, timestamp, result_data),
+                'ttl': int(time.time()) + _TTL_SECONDS
             }
             
-            self.table.put_item(Item=item)
+            if sync:
+                return _get_write_buffer(self.table_name, self.client).put_and_wait([item])
+            _get_write_buffer(self.table_name, self.client).put(item)
             return True
             
-        except Exception as e:
-            print(f"Error saving query result: {e}")
+        except Exception:
+            logger.exception("Error saving query result")
             return False
 
-    def get_query_result(self, user_id: str, timestamp: str) -> Optional[Dict]:
-        """Get specific query result by user_id and timestamp"""
-        if not self.table or not user_id or not timestamp:
-            return None
-        
-        try:
-            response = self.table.get_item(
-                Key={
-                    'user_id': user_id,
-                    'timestamp': timestamp
-                }
-            )
-            return response.get('Item')
-            
-        except Exception as e:
-            print(f"Error getting query result: {e}")
-            return None
-
     def save_query(self, user_id: str, query_data: Dict, result_data: Dict) -> bool:
         """Save query and result to DynamoDB"""
         if not self.table or not user_id:
             return False
         
         try:
-            timestamp = datetime.utcnow().isoformat()
+            now = time.time()
+            # Same ISO format as the UI-written items: the sort key has to order consistently
+            # within a user's partition, and the history routes and templates parse it as ISO
+            timestamp = datetime.utcfromtimestamp(now).isoformat()
             
             # Generate query summary
             query_summary = self._generate_query_summary(query_data)
@@ -116,50 +338,58 @@ class QueryHistoryService:
                 'timestamp': timestamp,
                 'query_type': query_data.get('query_type', 'natural_language'),
                 'query_summary': query_summary,
-                'query_data': json.dumps(query_data),
+                'query_data': _json_dumps(query_data),
                 'result_status': result_data.get('status', 'unknown'),
                 'result_summary': result_summary,
-                'result_data': json.dumps(result_data),
-                'ttl': int((datetime.utcnow() + timedelta(days=90)).timestamp())
+                'result_data': self._store_result_data(user_id, timestamp, result_data),
+                'ttl': int(now) + _TTL_SECONDS
             }
             
-            self.table.put_item(Item=item)
+            self.client.put_item(TableName=self.table_name, Item=_to_attribute_values(item))
+            _invalidate_user_history((user_id,))
             return True
             
-        except Exception as e:
-            print(f"Error saving query history: {e}")
+        except Exception:
+            logger.exception("Error saving query history")
             return False
     
-    def get_user_history(self, user_id: str, limit: int = 50) -> List[Dict]:
-        """Get user's query history from DynamoDB"""
+    def iter_user_history(self, user_id: str, limit: int = 50) -> Iterator[Dict]:
+        """
+        Yield user's query history from DynamoDB, latest first, one page at a time
+        
+        Only the listing attributes are read; the query and result payloads are loaded
+        by get_query_result when a single entry is opened.
+        """
         if not self.table or not user_id:
-            return []
+            return
         
+        query_args = {
+            'KeyConditionExpression': 'user_id = :uid',
+            'ExpressionAttributeValues': {':uid': user_id},
+            'ProjectionExpression': _HISTORY_LIST_PROJECTION,
+            'ExpressionAttributeNames': {'#ts': 'timestamp'},
+            'ScanIndexForward': False  # Latest first
+        }
+        remaining = limit
         try:
-            response = self.table.query(
-                KeyConditionExpression='user_id = :uid',
-                ExpressionAttributeValues={':uid': user_id},
-                ScanIndexForward=False,  # Latest first
-                Limit=limit
-            )
-            
-            items = []
-            for item in response.get('Items', []):
-                # Parse JSON strings back to objects
-                try:
-                    item['query_data'] = json.loads(item.get('query_data', '{}'))
-                    item['result_data'] = json.loads(item.get('result_data', '{}'))
-                except json.JSONDecodeError:
-                    item['query_data'] = {}
-                    item['result_data'] = {}
+            # A page stops at 1 MB, so follow LastEvaluatedKey until the limit is reached
+            while remaining > 0:
+                response = self.table.query(Limit=remaining, **query_args)
+                items = response.get('Items', [])
+                yield from items
+                remaining -= len(items)
                 
-                items.append(item)
-            
-            return items
-            
-        except Exception as e:
-            print(f"Error retrieving query history: {e}")
-            return []
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    break
+                query_args['ExclusiveStartKey'] = last_key
+                
+        except Exception:
+            logger.exception("Error retrieving query history")
+    
+    def get_user_history(self, user_id: str, limit: int = 50) -> List[Dict]:
+        """Get user's query history from DynamoDB"""
+        return list(self.iter_user_history(user_id, limit))
     
     def get_query_result(self, user_id: str, timestamp: str) -> Optional[Dict]:
         """Get specific query result"""
@@ -178,18 +408,88 @@ class QueryHistoryService:
             if item:
                 # Parse JSON strings
                 try:
-                    item['query_data'] = json.loads(item.get('query_data', '{}'))
-                    item['result_data'] = json.loads(item.get('result_data', '{}'))
+                    item['query_data'] = _json_loads(item.get('query_data', '{}'))
+                    item['result_data'] = _json_loads(item.get('result_data', '{}'))
                 except json.JSONDecodeError:
                     item['query_data'] = {}
                     item['result_data'] = {}
+                
+                # Large payloads only keep a pointer to S3 in the item
+                s3_key = item['result_data'].get('s3_key') if isinstance(item['result_data'], dict) else None
+                if s3_key and HISTORY_BUCKET:
+                    body = _s3_client().get_object(Bucket=HISTORY_BUCKET, Key=s3_key)['Body'].read()
+                    item['result_data'] = _json_loads(body)
             
             return item
             
-        except Exception as e:
-            print(f"Error retrieving query result: {e}")
+        except Exception:
+            logger.exception("Error retrieving query result")
             return None
     
+    def get_query_result_cached(self, user_id: str, timestamp: str) -> Optional[Dict]:
+        """Get specific query result, reusing a recent lookup of the same item"""
+        key = (user_id, timestamp)
+        now = time.monotonic()
+        with _result_cache_lock:
+            entry = _result_cache.get(key)
+            version = _result_version(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        
+        item = self.get_query_result(user_id, timestamp)
+        if item:
+            ttl = _RESULT_TTL_FINAL if item.get('result_status') in _FINAL_STATUSES else _RESULT_TTL_PENDING
+            with _result_cache_lock:
+                # The item was rewritten while it was being read, so what was read may be stale
+                if _result_version(key) != version:
+                    return item
+                if len(_result_cache) >= _RESULT_CACHE_MAXSIZE:
+                    for stale in [k for k, (expires, _) in _result_cache.items() if expires <= now]:
+                        del _result_cache[stale]
+                    while len(_result_cache) >= _RESULT_CACHE_MAXSIZE:
+                        del _result_cache[next(iter(_result_cache))]
+                _result_cache[key] = (now + ttl, item)
+        return item
+    
+    def _store_result_data(self, user_id: str, timestamp: str, result_data: Dict) -> str:
+        """Serialize result_data for the item, moving payloads too large for DynamoDB out of it"""
+        serialized = _json_dumps(result_data)
+        if len(serialized.encode('utf-8')) <= _MAX_INLINE_RESULT_BYTES:
+            return serialized
+        
+        if HISTORY_BUCKET:
+            key = f"{user_id}/{timestamp}.json"
+            _s3_client().put_object(Bucket=HISTORY_BUCKET, Key=key, Body=serialized.encode('utf-8'),
+                                    ContentType='application/json')
+            return _json_dumps({'s3_key': key})
+        
+        # No bucket configured: keep the item writable by shortening the report text
+        truncated = dict(result_data, truncated=True)
+        for field in ('report', 'markdown_content'):
+            if isinstance(truncated.get(field), str) and len(truncated[field]) > _TRUNCATED_REPORT_CHARS:
+                truncated[field] = truncated[field][:_TRUNCATED_REPORT_CHARS] + _TRUNCATION_NOTE
+        return _json_dumps(truncated)
+    
+    def get_user_history_cached(self, user_id: str, limit: int = 50) -> List[Dict]:
+        """Get user's query history, reusing a recent lookup of the same page"""
+        now = time.monotonic()
+        with _history_cache_lock:
+            entry = _history_cache.get(user_id, {}).get(limit)
+            version = _history_version(user_id)
+        if entry and entry[0] > now:
+            return entry[1]
+        
+        items = self.get_user_history(user_id, limit)
+        if items:
+            with _history_cache_lock:
+                # One of the user's items was written during the query, so the list may be stale
+                if _history_version(user_id) != version:
+                    return items
+                if user_id not in _history_cache and len(_history_cache) >= _HISTORY_CACHE_MAXSIZE:
+                    del _history_cache[next(iter(_history_cache))]
+                _history_cache.setdefault(user_id, {})[limit] = (now + _HISTORY_TTL, items)
+        return items
+    
     def _generate_query_summary(self, query_data: Dict) -> str:
         """Generate a human-readable summary of the query"""
         if query_data.get('query_type') == 'structured_form':
@@ -205,12 +505,4 @@ class QueryHistoryService:
     
     def _generate_result_summary(self, result_data: Dict) -> str:
         """Generate a summary of the result"""
-        status = result_data.get('status', 'unknown')
-        if status == 'success':
-            return "Revenue optimization recommendations"
-        elif status == 'partial_success':
-            return "Partial revenue recommendations"
-        elif status == 'error':
-            return "Query failed"
-        else:
-            return "Unknown result"
+        return _RESULT_SUMMARIES.get(result_data.get('status', 'unknown'), "Unknown result")
@@ -0,0 +1,35 @@
+import threading
+import markdown
+
+try:
+    import cmarkgfm
+except ImportError:
+    cmarkgfm = None
+
+# Fallback renderer: one Markdown converter per worker thread (instances are stateful
+# and not thread-safe), so the extensions are loaded once rather than on every render
+_md_local = threading.local()
+
+def render_markdown(text: str) -> str:
+    """Render markdown to HTML with tables and fenced code blocks"""
+    if cmarkgfm is not None:
+        # GitHub-flavored markdown covers tables and fenced code natively
+        return cmarkgfm.github_flavored_markdown_to_html(text)
+    md = getattr(_md_local, 'md', None)
+    if md is None:
+        md = _md_local.md = markdown.Markdown(extensions=['tables', 'fenced_code'])
+    return md.reset().convert(text)
+
+def iter_markdown_sections(text: str):
+    """Render markdown one `## ` section at a time, so long reports can be streamed"""
+    section = []
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if line.startswith(('```', '~~~')):
+            in_fence = not in_fence
+        elif line.startswith('## ') and not in_fence and section:
+            yield render_markdown(''.join(section))
+            section = []
+        section.append(line)
+    if section:
+        yield render_markdown(''.join(section))